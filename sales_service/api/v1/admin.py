@@ -0,0 +1,28 @@
+from typing import Any
+
+from fastapi import APIRouter, Query, status
+
+from db.db_connect import get_pool_metrics
+from db.slow_query_log import slow_query_log
+
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+
+@router.get("/pool", response_model=dict[str, Any], status_code=status.HTTP_200_OK)
+async def get_pool():
+    return get_pool_metrics()
+
+
+@router.get("/slow-queries", response_model=dict[str, Any], status_code=status.HTTP_200_OK)
+async def get_slow_queries(limit: int = Query(ge=1, le=1000, default=50)):
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": slow_query_log.recent(limit),
+    }
+
+
+@router.delete("/slow-queries", response_model=dict[str, str], status_code=status.HTTP_200_OK)
+async def clear_slow_queries():
+    slow_query_log.clear()
+    return {"msg": "Slow query log cleared."}
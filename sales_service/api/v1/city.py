@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, Query, status
 from schemas.response import CityResponse, SingleCityResponse
 from schemas.city import CreateCity, DeleteCity, UpdateCity
 from services.city import CityService, get_city_service
-from utils.dependency import db_dependency, repository_dependency
+from utils.dependency import db_dependency, read_db_dependency, repository_dependency
+from utils.pagination import TotalMode
 
 
 router = APIRouter(prefix="/api/v1/city", tags=["City"])
@@ -28,25 +29,30 @@ async def create_city(
 async def get_city(
     city_id: UUID,
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     city_service: city_dependency,
+    stores_limit: int = Query(ge=1, le=500, default=100),
+    stores_cursor: str | None = Query(None, description="Value of stores_next_cursor"),
+    include: str | None = Query(None, description="Comma-separated nested fields to load: stores"),
 ):
-    return await city_service.get_single_city(city_id, repository, session)
+    return await city_service.get_single_city(city_id, repository, session, stores_limit, stores_cursor, include)
 
 
 @router.get(
     "/",
-    response_model=dict[str, dict[str, int | None] | list[CityResponse | None]],
+    response_model=dict[str, dict[str, int | str | None] | list[CityResponse | None]],
     status_code=status.HTTP_200_OK,
 )
 async def get_cities(
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     city_service: city_dependency,
     page: int = Query(ge=1, default=1),
     size: int = Query(ge=10, le=50, default=10),
+    cursor: str | None = Query(None, description="Keyset pagination: empty for the first page, then links.next_cursor"),
+    with_total: TotalMode | None = Query(None, description="Add links.total: exact (window count) or estimate (planner statistics)"),
 ):
-    return await city_service.get_list_of_cities(page, size, repository, session)
+    return await city_service.get_list_of_cities(page, size, repository, session, cursor, with_total)
 
 
 @router.put("/", response_model=CityResponse, status_code=status.HTTP_200_OK)
@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, Query, status
 from schemas.response import ProductResponse, SingleProductResponse
 from schemas.product import CreateProduct, DeleteProduct, UpdateProduct
 from services.product import get_product_service, ProductService
-from utils.dependency import db_dependency, repository_dependency
+from utils.dependency import db_dependency, read_db_dependency, repository_dependency
+from utils.pagination import TotalMode
 
 
 router = APIRouter(prefix="/api/v1/product", tags=["Product"])
@@ -28,25 +29,30 @@ async def create_product(
 async def get_product(
     product_id: UUID,
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     product_service: product_dependency,
+    sales_limit: int = Query(ge=1, le=500, default=100),
+    sales_cursor: str | None = Query(None, description="Value of sales_next_cursor"),
+    include: str | None = Query(None, description="Comma-separated nested fields to load: store, sales"),
 ):
-    return await product_service.get_single_product(product_id, repository, session)
+    return await product_service.get_single_product(product_id, repository, session, sales_limit, sales_cursor, include)
 
 
 @router.get(
     "/",
-    response_model=dict[str, dict[str, int | None] | list[ProductResponse | None]],
+    response_model=dict[str, dict[str, int | str | None] | list[ProductResponse | None]],
     status_code=status.HTTP_200_OK,
 )
 async def get_products(
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     product_service: product_dependency,
     page: int = Query(ge=1, default=1),
     size: int = Query(ge=10, le=50, default=10),
+    cursor: str | None = Query(None, description="Keyset pagination: empty for the first page, then links.next_cursor"),
+    with_total: TotalMode | None = Query(None, description="Add links.total: exact (window count) or estimate (planner statistics)"),
 ):
-    return await product_service.get_list_of_products(size, page, repository, session)
+    return await product_service.get_list_of_products(size, page, repository, session, cursor, with_total)
 
 
 @router.put("/", response_model=ProductResponse, status_code=status.HTTP_200_OK)
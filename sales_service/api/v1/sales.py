@@ -1,22 +1,169 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from services.sales import SalesLogic, get_sales_logic
-from schemas.response import SaleResponse, SingleSaleResponse
+from configs.settings import settings
+from services.leaderboard import get_leaderboard_logic, LeaderboardLogic
+from services.sales import bulk_status_code, ExportFormat, SalesLogic, get_sales_logic, StatsGroup
+from schemas.response import (
+    BulkSaleResponse,
+    ProductLeaderboardResponse,
+    QueuedSaleResponse,
+    SaleResponse,
+    SaleStatsResponse,
+    SingleSaleResponse,
+    StoreLeaderboardResponse,
+)
 from schemas.sales import CreateSale, DeleteSale, UpdateSale
-from utils.dependency import db_dependency, repository_dependency
+from utils.conditional_get import not_modified
+from utils.dependency import db_dependency, read_db_dependency, repository_dependency
+from utils.pagination import TotalMode
 
 
 router = APIRouter(prefix="/api/v1/sales", tags=["Sales"])
 
 sale_dependency = Annotated[SalesLogic, Depends(get_sales_logic)]
+leaderboard_dependency = Annotated[LeaderboardLogic, Depends(get_leaderboard_logic)]
+idempotency_key_header = Annotated[
+    str | None,
+    Header(
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Repeated requests with the same key return the stored response",
+    ),
+]
+
+
+@router.post("/", response_model=SaleResponse | QueuedSaleResponse, status_code=status.HTTP_201_CREATED)
+async def create_sale(
+    sale: CreateSale,
+    sale_logic: sale_dependency,
+    session: db_dependency,
+    response: Response,
+    idempotency_key: idempotency_key_header = None,
+    prefer: str | None = Header(None, description="respond-async: accept the sale into the queue and return 202"),
+):
+    if not settings.sales_queue or "respond-async" not in (prefer or ""):
+        return await sale_logic.new_sale(sale, session, idempotency_key)
+
+    result = await sale_logic.enqueue_sale(sale, session, idempotency_key)
+    if isinstance(result, dict):
+        response.status_code = status.HTTP_202_ACCEPTED
+        response.headers["Location"] = f"{router.prefix}/queue/{result['id']}"
+        response.headers["Preference-Applied"] = "respond-async"
+
+    return result
+
+
+@router.post("/bulk", response_model=dict[str, list[BulkSaleResponse]], status_code=status.HTTP_201_CREATED)
+async def create_sales_bulk(
+    sale_logic: sale_dependency,
+    session: db_dependency,
+    response: Response,
+    sales: list[CreateSale] = Body(min_length=1, max_length=10000),
+    idempotency_key: idempotency_key_header = None,
+):
+    result = await sale_logic.new_sales_bulk(sales, session, idempotency_key)
+    if isinstance(result, dict):
+        response.status_code = bulk_status_code(result["data"])
+
+    return result
+
+
+@router.get("/queue/{sale_id}", response_model=QueuedSaleResponse, status_code=status.HTTP_200_OK)
+async def get_queued_sale(sale_id: UUID, sale_logic: sale_dependency, session: db_dependency):
+    return await sale_logic.get_queued_sale(sale_id, session)
+
+
+@router.get(
+    "/leaderboard/products",
+    response_model=ProductLeaderboardResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_product_leaderboard(
+    leaderboard_logic: leaderboard_dependency,
+    session: read_db_dependency,
+    request: Request,
+    response: Response,
+    city: UUID = Query(description="City ID"),
+    days: int = Query(7, description="Window: 7, 30 or 90 days"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    etag = await leaderboard_logic.get_etag("products", city, days, limit, session)
+    if (unchanged := not_modified(request, response, etag)) is not None:
+        return unchanged
+
+    return await leaderboard_logic.get_product_leaderboard(city, days, limit, session)
+
+
+@router.get(
+    "/leaderboard/stores",
+    response_model=StoreLeaderboardResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_store_leaderboard(
+    leaderboard_logic: leaderboard_dependency,
+    session: read_db_dependency,
+    request: Request,
+    response: Response,
+    city: UUID = Query(description="City ID"),
+    days: int = Query(7, description="Window: 7, 30 or 90 days"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    etag = await leaderboard_logic.get_etag("stores", city, days, limit, session)
+    if (unchanged := not_modified(request, response, etag)) is not None:
+        return unchanged
+
+    return await leaderboard_logic.get_store_leaderboard(city, days, limit, session)
+
 
+@router.get("/stats", response_model=dict[str, list[SaleStatsResponse]], status_code=status.HTTP_200_OK)
+async def get_sales_stats(
+    sale_logic: sale_dependency,
+    session: read_db_dependency,
+    group_by: StatsGroup = Query("day", description="Aggregation bucket"),
+    city: UUID | None = Query(None, description="City ID"),
+    store: UUID | None = Query(None, description="Store ID"),
+    product: UUID | None = Query(None, description="Product ID"),
+    days: int | None = Query(None),
+    price: float | None = Query(
+        None,
+        description="Usage: 5000 for >= or -5000 for <=",
+    ),
+    amount: int | None = Query(
+        None,
+        description="Usage: 5 for >= or -5 for <=",
+    ),
+):
+    return await sale_logic.get_sales_stats(group_by, city, store, product, days, price, amount, session)
+
+
+@router.get("/export", response_class=StreamingResponse, status_code=status.HTTP_200_OK)
+async def export_sales(
+    sale_logic: sale_dependency,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    city: UUID | None = Query(None, description="City ID"),
+    store: UUID | None = Query(None, description="Store ID"),
+    product: UUID | None = Query(None, description="Product ID"),
+    days: int | None = Query(None),
+    price: float | None = Query(
+        None,
+        description="Usage: 5000 for >= or -5000 for <=",
+    ),
+    amount: int | None = Query(
+        None,
+        description="Usage: 5 for >= or -5 for <=",
+    ),
+):
+    rows = sale_logic.export_sales(export_format, city, store, product, days, price, amount)
+    if export_format == "csv":
+        headers = {"Content-Disposition": 'attachment; filename="sales.csv"'}
+        return StreamingResponse(rows, media_type="text/csv", headers=headers)
 
-@router.post("/", response_model=SaleResponse, status_code=status.HTTP_201_CREATED)
-async def create_sale(sale: CreateSale, sale_logic: sale_dependency, session: db_dependency):
-    return await sale_logic.new_sale(sale, session)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
 
 
 @router.get("/{sale_id}", response_model=SingleSaleResponse, status_code=status.HTTP_200_OK)
@@ -24,19 +171,19 @@ async def get_sale(
     sale_id: UUID,
     sale_logic: sale_dependency,
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
 ):
     return await sale_logic.get_single_sale(sale_id, repository, session)
 
 
 @router.get(
     "/",
-    response_model=dict[str, dict[str, int | None] | list[SaleResponse | None]],
+    response_model=dict[str, dict[str, int | str | None] | list[SaleResponse | None]],
     status_code=status.HTTP_200_OK,
 )
 async def get_sales(
     sale_logic: sale_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     page: int = Query(ge=1, default=1),
     size: int = Query(ge=10, le=50, default=10),
     city: UUID | None = Query(None, description="City ID"),
@@ -51,8 +198,12 @@ async def get_sales(
         None,
         description="Usage: 5 for >= or -5 for <=",
     ),
+    cursor: str | None = Query(None, description="Keyset pagination: empty for the first page, then links.next_cursor"),
+    with_total: TotalMode | None = Query(None, description="Add links.total: exact (window count) or estimate (planner statistics)"),
 ):
-    return await sale_logic.get_list_of_sales(size, page, city, store, product, days, price, amount, session)
+    return await sale_logic.get_list_of_sales(
+        size, page, city, store, product, days, price, amount, session, cursor, with_total
+    )
 
 
 @router.put("/", response_model=SaleResponse, status_code=status.HTTP_200_OK)
@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, Query, status
 from schemas.response import SingleStoreResponse, StoreResponse
 from schemas.store import CreateStore, DeleteStore, UpdateStore
 from services.store import get_store_service, StoreService
-from utils.dependency import db_dependency, repository_dependency
+from utils.dependency import db_dependency, read_db_dependency, repository_dependency
+from utils.pagination import TotalMode
 
 
 router = APIRouter(prefix="/api/v1/store", tags=["Store"])
@@ -28,25 +29,30 @@ async def create_store(
 async def get_store(
     store_id: UUID,
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     store_service: store_dependency,
+    products_limit: int = Query(ge=1, le=500, default=100),
+    products_cursor: str | None = Query(None, description="Value of products_next_cursor"),
+    include: str | None = Query(None, description="Comma-separated nested fields to load: city, products"),
 ):
-    return await store_service.get_single_store(store_id, repository, session)
+    return await store_service.get_single_store(store_id, repository, session, products_limit, products_cursor, include)
 
 
 @router.get(
     "/",
-    response_model=dict[str, dict[str, int | None] | list[StoreResponse | None]],
+    response_model=dict[str, dict[str, int | str | None] | list[StoreResponse | None]],
     status_code=status.HTTP_200_OK,
 )
 async def get_stores(
     repository: repository_dependency,
-    session: db_dependency,
+    session: read_db_dependency,
     store_service: store_dependency,
     page: int = Query(ge=1, default=1),
     size: int = Query(ge=10, le=50, default=10),
+    cursor: str | None = Query(None, description="Keyset pagination: empty for the first page, then links.next_cursor"),
+    with_total: TotalMode | None = Query(None, description="Add links.total: exact (window count) or estimate (planner statistics)"),
 ):
-    return await store_service.get_list_of_stores(size, page, repository, session)
+    return await store_service.get_list_of_stores(size, page, repository, session, cursor, with_total)
 
 
 @router.put("/", response_model=StoreResponse, status_code=status.HTTP_200_OK)
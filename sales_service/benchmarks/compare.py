@@ -0,0 +1,45 @@
+"""
+Сравнение двух JSON-отчетов benchmarks.load_test.
+
+Запуск:
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(before: float | None, after: float | None) -> str:
+    if not before or after is None:
+        return "     n/a"
+
+    return f"{(after - before) / before * 100:+7.1f}%"
+
+
+def main(before_path: str, after_path: str) -> None:
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+
+    print(f"before: {before.get('commit')}  after: {after.get('commit')}")
+    if before.get("response_cache") or after.get("response_cache"):
+        print("warning: a run used the response cache, latencies mix cache hits and database queries")
+    if before.get("mode", "sequential") != after.get("mode", "sequential"):
+        print("warning: runs used different load modes (mixed/sequential), latencies are not comparable")
+    print(f"{'endpoint':<28}" + "".join(f"{metric:>22}" for metric in METRICS))
+    for name, result in after["endpoints"].items():
+        base = before["endpoints"].get(name, {})
+        cells = "".join(f"{result.get(metric)!s:>12} {change(base.get(metric), result.get(metric))}" for metric in METRICS)
+        print(f"{name:<28}{cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    main(args.before, args.after)
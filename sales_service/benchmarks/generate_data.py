@@ -0,0 +1,141 @@
+"""
+Генератор синтетических данных для нагрузочного тестирования. Данные загружаются через COPY.
+
+Запуск из директории сервиса (база из настроек, миграции применены):
+    python -m benchmarks.generate_data --cities 50 --stores 500 --products 200000 --sales 100000 [--days 365] [--truncate]
+
+Распределения: магазины по городам, продажи по магазинам и позиции по товарам магазина - степенные
+(крупные города, популярные магазины и товары получают большую долю), цены товаров - логнормальные,
+количество товаров в продаже - геометрическое, время продаж - равномерно по дням с пиком в дневные часы.
+"""
+import argparse
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta, UTC
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from configs.settings import settings
+from db.db_connect import async_session, engine
+from db.partitions import add_months, create_partitions, month_start
+from services.leaderboard import LEADERBOARD_VIEWS, leaderboard_logic
+from services.sales import sale_logic
+
+
+BATCH_SIZE = 50_000
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 7, 9, 10, 10, 10, 10, 9, 9, 9, 10, 10, 9, 7, 5, 3, 2]
+
+
+def power_weights(size: int, rng: random.Random, alpha: float = 1.1) -> list[float]:
+    weights = [1 / (rank + 1) ** alpha for rank in range(size)]
+    rng.shuffle(weights)
+    return weights
+
+
+def product_price(rng: random.Random) -> Decimal:
+    price = min(max(rng.lognormvariate(8, 1.2), 1), 9_999_999)
+    return Decimal(str(round(price, 2)))
+
+
+def sale_date(rng: random.Random, now: datetime, days: int) -> datetime:
+    day = now - timedelta(days=rng.randrange(days))
+    hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+    moment = day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=rng.randrange(1_000_000))
+    return min(moment, now)
+
+
+async def copy(driver, table: str, columns: list[str], records: list[tuple]) -> None:
+    for start in range(0, len(records), BATCH_SIZE):
+        await driver.copy_records_to_table(table, records=records[start:start + BATCH_SIZE], columns=columns)
+
+
+async def main(cities: int, stores: int, products: int, sales: int, days: int, truncate: bool, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+
+    city_rows = [(uuid4(), f"Город {index}") for index in range(cities)]
+    city_weights = power_weights(cities, rng)
+    store_rows = [(uuid4(), f"Магазин {index}", rng.choices(city_rows, city_weights)[0][0]) for index in range(stores)]
+
+    store_weights = power_weights(stores, rng)
+    catalog = {store_id: [] for store_id, _, _ in store_rows}
+    product_rows = []
+    for index, store in enumerate(rng.choices(store_rows, store_weights, k=products)):
+        product_id = uuid4()
+        created_at = now - timedelta(days=days, seconds=rng.randrange(86400))
+        product_rows.append(
+            (product_id, f"Товар {index}", "Описание товара", product_price(rng), created_at, created_at, store[0])
+        )
+        catalog[store[0]].append((product_id, product_rows[-1][3]))
+
+    catalog_weights = {store_id: power_weights(len(items), rng) for store_id, items in catalog.items() if items}
+    sale_rows, item_rows = [], []
+    for store in rng.choices(store_rows, store_weights, k=sales):
+        items = catalog[store[0]]
+        if not items:
+            continue
+
+        size = 1
+        while size < 10 and rng.random() < 0.45:
+            size += 1
+
+        sale_id, price, amount = uuid4(), Decimal(0), 0
+        sold_at = sale_date(rng, now, days)
+        basket = Counter(rng.choices(items, catalog_weights[store[0]], k=size))
+        for (product_id, unit_price), quantity in basket.items():
+            item_rows.append((sale_id, product_id, quantity, unit_price, sold_at))
+            price += unit_price * quantity
+            amount += quantity
+
+        sale_rows.append((sale_id, store[0], store[2], amount, price, sold_at))
+
+    async with engine.connect() as connection:
+        first, current = (now - timedelta(days=days)).date(), month_start(now.date())
+        await create_partitions(connection, first, add_months(current, settings.sales_partitions_ahead))
+        await connection.commit()
+
+    async with engine.connect() as connection:
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        if truncate:
+            await driver.execute("TRUNCATE city, store, sales, sale_item, product, sales_daily_rollup CASCADE")
+
+        await copy(driver, "city", ["id", "name"], city_rows)
+        await copy(driver, "store", ["id", "name", "city_id"], store_rows)
+        await copy(driver, "product", ["id", "name", "description", "price", "created_at", "updated_at", "store_id"], product_rows)
+        await copy(driver, "sales", ["id", "store_id", "city_id", "amount", "price", "sale_date"], sale_rows)
+        await copy(driver, "sale_item", ["sale_id", "product_id", "quantity", "unit_price", "sale_date"], item_rows)
+
+    async with async_session() as session:
+        await sale_logic.rebuild_daily_rollup(session)
+
+    for view in LEADERBOARD_VIEWS:
+        async with async_session() as session:
+            await leaderboard_logic.refresh_view(view, timedelta(0), session)
+
+    async with engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("ANALYZE"))
+
+    await engine.dispose()
+    print(
+        f"cities={len(city_rows)} stores={len(store_rows)} products={len(product_rows)} "
+        f"sales={len(sale_rows)} items={len(item_rows)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=50)
+    parser.add_argument("--stores", type=int, default=500)
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--sales", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="remove existing data first")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.cities, args.stores, args.products, args.sales, args.days, args.truncate, args.seed))
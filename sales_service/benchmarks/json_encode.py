@@ -0,0 +1,127 @@
+"""
+Микро-бенчмарк кодирования страницы из 50 продаж/товаров в JSON. База не нужна.
+
+Запуск из директории сервиса:
+    python -m benchmarks.json_encode [--rows 50] [--repeat 2000]
+
+Сравниваются:
+    json      - путь FastAPI по умолчанию: валидация response_model, сериализация и JSONResponse (json.dumps);
+    orjson    - тот же путь с FastJSONResponse;
+    fast_path - быстрый путь списков (render_list): словари строк без моделей.
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, UTC
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from configs.settings import settings
+from schemas.response import ProductResponse, SaleResponse
+from utils.serialization import FastJSONResponse, render_list
+
+
+SaleRow = namedtuple("SaleRow", ("id", "store_id", "city_id", "amount", "price", "sale_date"))
+ProductRow = namedtuple(
+    "ProductRow",
+    ("id", "name", "description", "price", "store_id", "created_at", "updated_at"),
+)
+
+
+class Row:
+    """
+    Минимальная замена Row из SQLAlchemy: атрибуты и _asdict().
+    """
+
+    def __init__(self, values) -> None:
+        self.values = values
+
+    def __getattr__(self, name):
+        return getattr(self.values, name)
+
+    def _asdict(self) -> dict:
+        return self.values._asdict()
+
+
+def make_sales(rows: int) -> list[SaleRow]:
+    now = datetime.now(UTC)
+    return [
+        SaleRow(
+            uuid4(),
+            uuid4(),
+            uuid4(),
+            random.randint(1, 10),
+            Decimal(random.randint(100, 500000)) / 100,
+            now - timedelta(seconds=random.randint(0, 86400 * 30)),
+        )
+        for _ in range(rows)
+    ]
+
+
+def make_products(rows: int) -> list[ProductRow]:
+    now = datetime.now(UTC)
+    return [
+        ProductRow(
+            uuid4(),
+            f"Пылесос модель {index}",
+            "Описание товара " * 5,
+            Decimal(random.randint(100, 500000)) / 100,
+            uuid4(),
+            now,
+            now,
+        )
+        for index in range(rows)
+    ]
+
+
+def page(data: list) -> dict:
+    return {"links": {"prev": None, "next": 2}, "data": data}
+
+
+def measure(encode, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+
+    return timings
+
+
+def main(rows: int, repeat: int) -> None:
+    settings.list_fast_path = True
+    for name, schema, data in (("sales", SaleResponse, make_sales(rows)), ("products", ProductResponse, make_products(rows))):
+        adapter = TypeAdapter(dict[str, dict[str, int | str | None] | list[schema | None]])
+
+        def model_path(response_class):
+            validated = adapter.validate_python(page(data), from_attributes=True)
+            return response_class(adapter.dump_python(validated, mode="json")).body
+
+        # В быстром пути Numeric приводится к float на стороне базы.
+        rows_data = [Row(row._replace(price=float(row.price))) for row in data]
+
+        def fast_path():
+            return render_list(page(list(rows_data))).body
+
+        results = {
+            "json": measure(lambda: model_path(JSONResponse), repeat),
+            "orjson": measure(lambda: model_path(FastJSONResponse), repeat),
+            "fast_path": measure(fast_path, repeat),
+        }
+        print(f"{name}: {rows} rows x {repeat}")
+        for encoder, timings in results.items():
+            print(f"  {encoder:<10} mean {statistics.mean(timings):9.1f} us  p50 {statistics.median(timings):9.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    main(args.rows, args.repeat)
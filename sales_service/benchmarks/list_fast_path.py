@@ -0,0 +1,90 @@
+"""
+Сравнение ORM-пути и быстрого пути (строки Core + прямая сериализация) для списков.
+
+Запуск из директории сервиса (нужна база с данными):
+    python -m benchmarks.list_fast_path [--route sales|city|store|product] [--size 50] [--repeat 200]
+
+Для ORM-пути время включает валидацию и сериализацию по response_model так же, как это делает FastAPI.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from configs.settings import settings
+from db.db_connect import async_session, engine
+from models.location import City, Store
+from models.product import Product
+from repository.repository import repository
+from schemas.response import CityResponse, ProductResponse, SaleResponse, StoreResponse
+from services.base import BaseService
+from services.sales import sale_logic
+
+
+ROUTES = {
+    "sales": SaleResponse,
+    "city": CityResponse,
+    "store": StoreResponse,
+    "product": ProductResponse,
+}
+MODELS = {"city": City, "store": Store, "product": Product}
+
+service = BaseService()
+
+
+async def fetch_page(route: str, size: int, session):
+    if route == "sales":
+        return await sale_logic.get_list_of_sales(size, 1, None, None, None, None, None, None, session)
+
+    return await service.get_list_rows(1, size, MODELS[route], repository, session)
+
+
+async def run(route: str, size: int, repeat: int, fast_path: bool) -> list[float]:
+    settings.list_fast_path = fast_path
+    adapter = TypeAdapter(dict[str, dict[str, int | str | None] | list[ROUTES[route] | None]])
+    timings = []
+    async with async_session() as session:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = await fetch_page(route, size, session)
+            if isinstance(result, Response):
+                body = result.body
+            else:
+                body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+
+            timings.append((time.perf_counter() - start) * 1000)
+            session.expunge_all()
+
+    assert body
+    return timings
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return f"mean {statistics.mean(timings):7.3f} ms  p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms"
+
+
+async def main(route: str, size: int, repeat: int) -> None:
+    await run(route, size, min(repeat, 10), True)
+    orm = await run(route, size, repeat, False)
+    fast = await run(route, size, repeat, True)
+    await engine.dispose()
+
+    print(f"route={route} size={size} repeat={repeat}")
+    print(f"orm   {summary(orm)}")
+    print(f"fast  {summary(fast)}")
+    print(f"speedup x{statistics.mean(orm) / statistics.mean(fast):.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--route", choices=ROUTES, default="sales")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.route, args.size, args.repeat))
@@ -0,0 +1,373 @@
+"""
+Нагрузочный тест всех маршрутов API. Запросы выполняются конкурентно асинхронным HTTP-клиентом (httpx),
+результат - JSON с RPS и задержками p50/p95/p99 по каждому маршруту для сравнения между коммитами.
+
+По умолчанию все сценарии идут одновременно смешанной нагрузкой: каждый запрос выбирает сценарий
+случайно с весом из WEIGHTS (чтения чаще записей), всего --requests запросов на сценарий в среднем.
+Так записи конкурируют с чтениями за блокировки и соединения, как в работе сервиса. --sequential
+запускает сценарии по очереди, каждый отдельно по --requests запросов.
+
+Запуск из директории сервиса (сервис запущен, данные сгенерированы benchmarks.generate_data):
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 20 --requests 500 --output result.json
+
+Сравнение двух прогонов: python -m benchmarks.compare before.json after.json
+
+Стоимость запросов к базе измеряется с выключенным кэшем ответов (RESPONSE_CACHE_BACKEND=off): иначе задержки
+смешивают попадания в кэш и запросы к базе в пропорции, зависящей от чередования записей. Если сервис
+отвечает с заголовком X-Cache, тест останавливается; --allow-cache разрешает прогон, доля попаданий
+каждого маршрута (cache_hit_ratio) сохраняется в отчете.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, UTC
+from uuid import uuid4
+
+import httpx
+
+
+# Относительная частота сценариев в смешанной нагрузке; не указанные - 1.
+WEIGHTS = {
+    "city_list": 3,
+    "city_detail": 3,
+    "store_list": 3,
+    "store_detail": 3,
+    "product_list": 5,
+    "product_detail": 5,
+    "sales_detail": 10,
+    "sales_list": 10,
+    "sales_list_city": 5,
+    "sales_list_store": 5,
+    "sales_list_product": 3,
+    "sales_list_cursor": 3,
+    "sales_stats_city": 2,
+    "sales_stats_day": 2,
+    "leaderboard_products": 2,
+    "leaderboard_stores": 2,
+    "sales_create": 5,
+}
+
+
+class Scenario:
+    """
+    Сценарий одного маршрута: request() без аргументов возвращает (метод, путь, параметры, тело),
+    нужное состояние замыкается при создании сценария. weight - частота в смешанной нагрузке.
+    """
+
+    def __init__(self, name: str, request, expected: tuple[int, ...] = (200,), on_response=None) -> None:
+        self.name = name
+        self.request = request
+        self.expected = expected
+        self.on_response = on_response
+        self.weight = WEIGHTS.get(name, 1)
+
+
+class State:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.cities: list[str] = []
+        self.stores: list[dict] = []
+        self.products: list[dict] = []
+        self.sales: list[str] = []
+        self.store_products: dict[str, list[str]] = {}
+        self.created: dict[str, list[str]] = {"city": [], "store": [], "product": [], "sales": []}
+        self.response_cache = False
+
+    def city(self) -> str:
+        return self.rng.choice(self.cities)
+
+    def store(self) -> dict:
+        return self.rng.choice(self.stores)
+
+    def product(self) -> dict:
+        return self.rng.choice(self.products)
+
+    def sale_body(self) -> dict:
+        store = self.store()
+        products = self.store_products.get(store["id"]) or [self.product()["id"]]
+        return {
+            "store_id": store["id"],
+            "city_id": store["city_id"],
+            "products": self.rng.sample(products, min(len(products), 3)),
+        }
+
+    def pop_created(self, entity: str) -> str:
+        return self.created[entity].pop() if self.created[entity] else str(uuid4())
+
+
+def remember(entity: str):
+    def on_response(state: State, response: httpx.Response) -> None:
+        state.created[entity].append(response.json()["id"])
+
+    return on_response
+
+
+def scenarios(state: State) -> list[Scenario]:
+    rng = state.rng
+    sale_filters = {
+        "sales_list": lambda: {},
+        "sales_list_city": lambda: {"city": state.city()},
+        "sales_list_store": lambda: {"store": state.store()["id"]},
+        "sales_list_product": lambda: {"product": state.product()["id"]},
+        "sales_list_days": lambda: {"days": 7},
+        "sales_list_price": lambda: {"price": rng.choice((5000, -5000))},
+        "sales_list_amount": lambda: {"amount": rng.choice((3, -3))},
+        "sales_list_city_days_price": lambda: {"city": state.city(), "days": 30, "price": 5000},
+        "sales_list_cursor": lambda: {"cursor": ""},
+        "sales_list_deep_page": lambda: {"page": 200},
+    }
+    result = [
+        Scenario("city_list", lambda: ("GET", "/api/v1/city/", {"size": 50}, None)),
+        Scenario("city_detail", lambda: ("GET", f"/api/v1/city/{state.city()}", {}, None)),
+        Scenario("store_list", lambda: ("GET", "/api/v1/store/", {"size": 50}, None)),
+        Scenario("store_detail", lambda: ("GET", f"/api/v1/store/{state.store()['id']}", {}, None)),
+        Scenario("product_list", lambda: ("GET", "/api/v1/product/", {"size": 50}, None)),
+        Scenario("product_detail", lambda: ("GET", f"/api/v1/product/{state.product()['id']}", {}, None)),
+        Scenario("sales_detail", lambda: ("GET", f"/api/v1/sales/{rng.choice(state.sales)}", {}, None)),
+        Scenario("sales_stats_city", lambda: ("GET", "/api/v1/sales/stats", {"group_by": "city", "days": 30}, None)),
+        Scenario("sales_stats_day", lambda: ("GET", "/api/v1/sales/stats", {"group_by": "day", "days": 30}, None)),
+        Scenario("sales_export_day", lambda: ("GET", "/api/v1/sales/export", {"days": 1}, None)),
+        Scenario(
+            "leaderboard_products",
+            lambda: ("GET", "/api/v1/sales/leaderboard/products", {"city": state.city(), "days": 30}, None),
+        ),
+        Scenario(
+            "leaderboard_stores",
+            lambda: ("GET", "/api/v1/sales/leaderboard/stores", {"city": state.city(), "days": 30}, None),
+        ),
+    ]
+    for name, params in sale_filters.items():
+        result.append(Scenario(name, lambda params=params: ("GET", "/api/v1/sales/", {"size": 50, **params()}, None)))
+
+    result += [
+        Scenario(
+            "city_create",
+            lambda: ("POST", "/api/v1/city/", {}, {"name": f"bench-{uuid4().hex[:8]}"}),
+            (201,),
+            remember("city"),
+        ),
+        Scenario(
+            "store_create",
+            lambda: ("POST", "/api/v1/store/", {}, {"name": f"bench-{uuid4().hex[:8]}", "city_id": state.city()}),
+            (201,),
+            remember("store"),
+        ),
+        Scenario(
+            "product_create",
+            lambda: (
+                "POST",
+                "/api/v1/product/",
+                {},
+                {"name": "bench", "description": "bench", "price": rng.randint(1, 100000), "store_id": state.store()["id"]},
+            ),
+            (201,),
+            remember("product"),
+        ),
+        Scenario("sales_create", lambda: ("POST", "/api/v1/sales/", {}, state.sale_body()), (201,), remember("sales")),
+        Scenario("sales_bulk_100", lambda: ("POST", "/api/v1/sales/bulk", {}, [state.sale_body() for _ in range(100)]), (201,)),
+        Scenario(
+            "city_update",
+            lambda: ("PUT", "/api/v1/city/", {}, {"id": state.pop_created("city"), "name": "bench-updated"}),
+            (200, 404),
+        ),
+        Scenario(
+            "store_update",
+            lambda: ("PUT", "/api/v1/store/", {}, {"id": state.pop_created("store"), "name": "bench-updated", "city_id": state.city()}),
+            (200, 404),
+        ),
+        Scenario(
+            "product_update",
+            lambda: (
+                "PUT",
+                "/api/v1/product/",
+                {},
+                {"id": state.pop_created("product"), "name": "bench", "description": None, "price": 1, "store_id": state.store()["id"]},
+            ),
+            (200, 404),
+        ),
+        Scenario("sales_update", lambda: ("PUT", "/api/v1/sales/", {}, {"id": state.pop_created("sales"), **state.sale_body()}), (200, 404)),
+        Scenario("sales_delete", lambda: ("DELETE", "/api/v1/sales/", {}, {"id": state.pop_created("sales")}), (200, 404)),
+        Scenario("product_delete", lambda: ("DELETE", "/api/v1/product/", {}, {"id": state.pop_created("product")}), (200, 404)),
+        Scenario("store_delete", lambda: ("DELETE", "/api/v1/store/", {}, {"id": state.pop_created("store")}), (200, 404)),
+        Scenario("city_delete", lambda: ("DELETE", "/api/v1/city/", {}, {"id": state.pop_created("city")}), (200, 404)),
+    ]
+    return result
+
+
+async def load_state(client: httpx.AsyncClient, state: State) -> None:
+    async def collect(path: str, pages: int) -> list[dict]:
+        rows, cursor = [], ""
+        for _ in range(pages):
+            response = await client.get(path, params={"size": 50, "cursor": cursor})
+            response.raise_for_status()
+            state.response_cache |= "x-cache" in response.headers
+            body = response.json()
+            rows += body["data"]
+            cursor = body["links"].get("next_cursor")
+            if not cursor:
+                break
+
+        return rows
+
+    state.cities = [city["id"] for city in await collect("/api/v1/city/", 4)]
+    state.stores = await collect("/api/v1/store/", 20)
+    state.products = await collect("/api/v1/product/", 40)
+    state.sales = [sale["id"] for sale in await collect("/api/v1/sales/", 20)]
+    for product in state.products:
+        state.store_products.setdefault(product["store_id"], []).append(product["id"])
+    if not (state.cities and state.stores and state.products and state.sales):
+        raise SystemExit("No data: run python -m benchmarks.generate_data first.")
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.cache_hits = 0
+        self.cached = False
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        percentile = lambda q: round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 3) if latencies else None
+        return {
+            "requests": len(latencies) + self.errors,
+            "errors": self.errors,
+            "rps": round(len(latencies) / elapsed, 2) if elapsed else 0,
+            "mean_ms": round(statistics.mean(latencies), 3) if latencies else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "cache_hit_ratio": round(self.cache_hits / len(latencies), 3) if self.cached else None,
+        }
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient,
+    state: State,
+    scenarios: list[Scenario],
+    concurrency: int,
+    requests: int,
+) -> dict[str, dict]:
+    """
+    requests запросов в concurrency потоков; сценарий каждого запроса выбирается случайно по весам.
+    RPS сценария - его успешные запросы за общее время прогона.
+    """
+    stats = {scenario.name: Stats() for scenario in scenarios}
+    weights = [scenario.weight for scenario in scenarios]
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            scenario = state.rng.choices(scenarios, weights)[0]
+            result = stats[scenario.name]
+            method, path, params, body = scenario.request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                await response.aread()
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+
+            result.latencies.append((time.perf_counter() - start) * 1000)
+            if "x-cache" in response.headers:
+                result.cached = True
+                result.cache_hits += response.headers["x-cache"] == "hit"
+            if response.status_code not in scenario.expected:
+                result.errors += 1
+            elif scenario.on_response and response.status_code in (200, 201):
+                scenario.on_response(state, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {name: result.summary(elapsed) for name, result in stats.items()}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(
+    base_url: str,
+    concurrency: int,
+    requests: int,
+    only: list[str] | None,
+    seed: int,
+    output: str | None,
+    allow_cache: bool,
+    sequential: bool,
+) -> None:
+    state = State(random.Random(seed))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await load_state(client, state)
+        if state.response_cache and not allow_cache:
+            raise SystemExit(
+                "Response cache is enabled (X-Cache header): restart the service with RESPONSE_CACHE_BACKEND=off "
+                "to measure query cost, or pass --allow-cache."
+            )
+
+        selected = [scenario for scenario in scenarios(state) if not only or scenario.name in only]
+        results = {}
+        if sequential:
+            for scenario in selected:
+                results |= await run_scenarios(client, state, [scenario], concurrency, requests)
+                print(f"{scenario.name:<28} {json.dumps(results[scenario.name])}", flush=True)
+        else:
+            results = await run_scenarios(client, state, selected, concurrency, requests * len(selected))
+            for name, result in results.items():
+                print(f"{name:<28} {json.dumps(result)}", flush=True)
+
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now(UTC).isoformat(),
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "mode": "sequential" if sequential else "mixed",
+        "requests_per_endpoint": requests,
+        "response_cache": state.response_cache,
+        "endpoints": results,
+    }
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint (on average in the mixed run)")
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--allow-cache", action="store_true", help="run against a service with the response cache on")
+    parser.add_argument("--sequential", action="store_true", help="run scenarios one at a time instead of a weighted mix")
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            args.base_url,
+            args.concurrency,
+            args.requests,
+            args.only,
+            args.seed,
+            args.output,
+            args.allow_cache,
+            args.sequential,
+        )
+    )
@@ -0,0 +1,36 @@
+"""
+Проверка конфигурации ORM-моделей без подключения к базе.
+
+Запуск из директории сервиса:
+    python -m commands.check_models
+
+Импортирует приложение (все модели, сервисы и маршруты) и выполняет configure_mappers(): ошибки
+связей (условия соединения, внешние ключи) проявляются сразу, а не первым запросом к API.
+Код возврата 1 при ошибке; команду стоит запускать перед слиянием изменений в моделях.
+"""
+import argparse
+import sys
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+
+from db.db_connect import Base
+from main import app
+
+
+def main() -> int:
+    try:
+        configure_mappers()
+    except SQLAlchemyError as error:
+        print(f"mapper configuration failed: {error}", file=sys.stderr)
+        return 1
+
+    print(f"{len(Base.registry.mappers)} mapper(s) configured, {len(app.routes)} route(s) loaded.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    sys.exit(main())
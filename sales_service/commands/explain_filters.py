@@ -0,0 +1,112 @@
+"""
+Проверка планов запросов GET /api/v1/sales для всех комбинаций фильтров.
+
+Запуск из директории сервиса:
+    python -m commands.explain_filters [--allow-seqscan]
+
+По умолчанию Seq Scan запрещается на время проверки, поэтому команда доказывает,
+что для каждой комбинации фильтров существует подходящий индекс. С флагом
+--allow-seqscan проверяется реальный выбор планировщика (имеет смысл на
+объеме данных, близком к боевому). Код возврата 1, если хотя бы одна
+комбинация читает sales или product последовательным сканированием.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from itertools import combinations
+from uuid import uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from db.db_connect import async_session, engine
+from db.partitions import parent_table
+from models.location import City, Store
+from models.product import SaleItem, Sales
+from services.sales import sale_logic
+
+
+CHECKED_TABLES = ("sales", "sale_item")
+FILTERS = ("city", "store", "product", "days", "price", "amount")
+
+
+async def sample_filters(session) -> dict:
+    """
+    Значения фильтров берутся из существующих данных, при их отсутствии - случайные.
+    """
+    city = await session.scalar(select(City.id).limit(1))
+    store = await session.scalar(select(Store.id).limit(1))
+    product = await session.scalar(select(SaleItem.product_id).limit(1))
+
+    return {
+        "city": city or uuid4(),
+        "store": store or uuid4(),
+        "product": product or uuid4(),
+        "days": 7,
+        "price": 5000.0,
+        "amount": 5,
+    }
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    # Таблицы секционированы по месяцам, поэтому в плане фигурируют имена секций
+    if plan.get("Node Type") == "Seq Scan" and parent_table(plan.get("Relation Name", "")) in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child))
+
+    return found
+
+
+async def explain(session, filters: dict) -> list[str]:
+    query = sale_logic.filter_sales_query(
+        select(Sales),
+        filters.get("city"),
+        filters.get("store"),
+        filters.get("product"),
+        filters.get("days"),
+        filters.get("price"),
+        filters.get("amount"),
+    )
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return seq_scans(plan[0]["Plan"])
+
+
+async def main(allow_seqscan: bool) -> int:
+    failed = 0
+    async with async_session() as session:
+        values = await sample_filters(session)
+        await session.commit()
+
+        if not allow_seqscan:
+            await session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        for size in range(1, len(FILTERS) + 1):
+            for names in combinations(FILTERS, size):
+                scans = await explain(session, {name: values[name] for name in names})
+                status = "SEQ SCAN on " + ", ".join(scans) if scans else "index"
+                print(f"{'+'.join(names):<45} {status}")
+                failed += bool(scans)
+
+        await session.rollback()
+
+    await engine.dispose()
+    print(f"\n{failed} combination(s) without index access.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--allow-seqscan", action="store_true", help="do not disable Seq Scan in the planner")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.allow_seqscan)))
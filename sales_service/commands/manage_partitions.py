@@ -0,0 +1,48 @@
+"""
+Обслуживание месячных секций sales и sale_item.
+
+Запуск из директории сервиса:
+    python -m commands.manage_partitions [--ahead 3] [--retention-months 24] [--detach-only] [--dry-run]
+
+Создает секции на текущий и --ahead следующих месяцев (по умолчанию SALES_PARTITIONS_AHEAD).
+Секции старше --retention-months полных месяцев (по умолчанию SALES_RETENTION_MONTHS, 0 - хранить все)
+отсоединяются и удаляются; с --detach-only остаются отдельными таблицами для архивации.
+Дневные агрегаты sales_daily_rollup за удаленные месяцы сохраняются.
+"""
+import argparse
+import asyncio
+from datetime import datetime, UTC
+
+from configs.settings import settings
+from db.db_connect import engine
+from db.partitions import add_months, create_partitions, expire_partitions, month_start
+
+
+async def main(ahead: int, retention_months: int, detach_only: bool, dry_run: bool) -> None:
+    current = month_start(datetime.now(UTC).date())
+    async with engine.connect() as connection:
+        created = await create_partitions(connection, current, add_months(current, ahead))
+        expired = []
+        if retention_months:
+            expired = await expire_partitions(connection, add_months(current, -retention_months), drop=not detach_only)
+
+        if dry_run:
+            await connection.rollback()
+        else:
+            await connection.commit()
+
+    await engine.dispose()
+    prefix = "would be " if dry_run else ""
+    print(f"{prefix}created: {', '.join(created) or '-'}")
+    print(f"{prefix}{'detached' if detach_only else 'dropped'}: {', '.join(expired) or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=settings.sales_partitions_ahead, help="future months to create")
+    parser.add_argument("--retention-months", type=int, default=settings.sales_retention_months, help="0 keeps everything")
+    parser.add_argument("--detach-only", action="store_true", help="detach expired partitions without dropping them")
+    parser.add_argument("--dry-run", action="store_true", help="roll back instead of committing")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.ahead, args.retention_months, args.detach_only, args.dry_run))
@@ -0,0 +1,29 @@
+"""
+Удаление истекших ключей идемпотентности (IDEMPOTENCY_KEY_TTL).
+
+Запуск из директории сервиса:
+    python -m commands.purge_idempotency_keys
+
+Истекшие ключи не влияют на ответы и перезаписываются при повторном использовании,
+команда только ограничивает размер таблицы; ее удобно запускать по расписанию.
+"""
+import argparse
+import asyncio
+
+from db.db_connect import async_session, engine
+from services.idempotency import idempotency_keys
+
+
+async def main() -> None:
+    async with async_session() as session:
+        rows = await idempotency_keys.purge(session)
+
+    await engine.dispose()
+    print(f"idempotency_key purged: {rows} row(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    asyncio.run(main())
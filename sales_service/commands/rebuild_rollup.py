@@ -0,0 +1,30 @@
+"""
+Пересчет таблицы sales_daily_rollup по данным sales.
+
+Запуск из директории сервиса:
+    python -m commands.rebuild_rollup [--since YYYY-MM-DD]
+
+Без --since таблица пересчитывается полностью, иначе только начиная с указанных суток (UTC).
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from db.db_connect import async_session, engine
+from services.sales import sale_logic
+
+
+async def main(since: date | None) -> None:
+    async with async_session() as session:
+        rows = await sale_logic.rebuild_daily_rollup(session, since)
+
+    await engine.dispose()
+    print(f"sales_daily_rollup rebuilt: {rows} row(s).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="first UTC day to rebuild")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.since))
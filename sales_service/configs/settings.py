@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -13,7 +15,45 @@ class Settings(BaseSettings):
     pg_host: str = Field("localhost", alias="POSTGRES_HOST")
     pg_port: int = Field(5432, alias="POSTGRES_PORT")
 
+    pg_pool_size: int = Field(5, alias="POSTGRES_POOL_SIZE")
+    pg_max_overflow: int = Field(10, alias="POSTGRES_MAX_OVERFLOW")
+    pg_pool_timeout: float = Field(30, alias="POSTGRES_POOL_TIMEOUT")
+    pg_pool_pre_ping: bool = Field(True, alias="POSTGRES_POOL_PRE_PING")
+    pg_pool_recycle: int = Field(1800, alias="POSTGRES_POOL_RECYCLE")
+    pg_statement_cache_size: int = Field(100, alias="POSTGRES_STATEMENT_CACHE_SIZE")
+    pg_statement_timeout: int = Field(0, alias="POSTGRES_STATEMENT_TIMEOUT_MS")
+
+    pg_replica_dsns: str = Field("", alias="POSTGRES_REPLICA_DSNS")
+    pg_replica_retry_interval: float = Field(30, alias="POSTGRES_REPLICA_RETRY_INTERVAL")
+
+    response_cache_backend: Literal["off", "memory", "redis"] = Field("off", alias="RESPONSE_CACHE_BACKEND")
+    response_cache_url: str = Field("redis://localhost:6379/0", alias="RESPONSE_CACHE_URL")
+    response_cache_size: int = Field(10000, alias="RESPONSE_CACHE_SIZE")
+    response_cache_ttl: float = Field(30, alias="RESPONSE_CACHE_TTL")
+    http_cache_max_age: int = Field(0, alias="HTTP_CACHE_MAX_AGE")
+
+    list_fast_path: bool = Field(True, alias="LIST_FAST_PATH")
+    json_response: Literal["orjson", "json"] = Field("orjson", alias="JSON_RESPONSE")
+
+    request_metrics: bool = Field(True, alias="REQUEST_METRICS")
+    slow_query_threshold_ms: float = Field(500, alias="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_log_size: int = Field(200, alias="SLOW_QUERY_LOG_SIZE")
+    slow_query_explain: bool = Field(False, alias="SLOW_QUERY_EXPLAIN")
+
+    sales_partitions_ahead: int = Field(3, alias="SALES_PARTITIONS_AHEAD")
+    sales_retention_months: int = Field(0, alias="SALES_RETENTION_MONTHS")
+
+    idempotency_key_ttl: int = Field(86400, alias="IDEMPOTENCY_KEY_TTL")
+
+    sales_queue: bool = Field(False, alias="SALES_QUEUE")
+    sales_queue_batch_size: int = Field(500, alias="SALES_QUEUE_BATCH_SIZE")
+    sales_queue_poll_interval: float = Field(0.5, alias="SALES_QUEUE_POLL_INTERVAL")
+    sales_queue_retention: int = Field(86400, alias="SALES_QUEUE_RETENTION")
+
+    leaderboard_refresh_interval: int = Field(300, alias="LEADERBOARD_REFRESH_INTERVAL")
+
 
 settings = Settings()
 
 database_dsn = f"postgresql+asyncpg://{settings.pg_user}:{settings.pg_password}@{settings.pg_host}:{settings.pg_port}/{settings.pg_name}"
+replica_dsns = [dsn.strip() for dsn in settings.pg_replica_dsns.split(",") if dsn.strip()]
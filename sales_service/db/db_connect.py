@@ -1,17 +1,172 @@
+import os
+import time
+from contextvars import ContextVar
+from itertools import count
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event, exc
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from configs.settings import database_dsn
+from configs.settings import database_dsn, replica_dsns, settings
+from db.slow_query_log import slow_query_log
 
 
 Base = declarative_base()
 
-engine = create_async_engine(database_dsn)
+
+class PoolStats:
+    """
+    Счетчики ожидания соединения из пула одного движка в рамках одного воркера.
+    """
+
+    def __init__(self) -> None:
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed: float, timed_out: bool = False) -> None:
+        self.waits += 1
+        self.wait_total += elapsed
+        self.wait_max = max(self.wait_max, elapsed)
+        self.timeouts += timed_out
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул со своими счетчиками ожидания: у основной базы и каждой реплики статистика раздельная.
+    Таймаутом считается только исчерпание pool_timeout, ошибки подключения - обычное ожидание.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        except Exception:
+            self.stats.record(time.perf_counter() - start)
+            raise
+
+        self.stats.record(time.perf_counter() - start)
+
+        return connection
+
+
+class QueryStats:
+    """
+    Число SQL-запросов и суммарное время их выполнения в рамках одного HTTP-запроса.
+    """
+
+    __slots__ = ("count", "duration", "scope")
+
+    def __init__(self, scope: dict | None = None) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.scope = scope or {}
+
+    @property
+    def route(self) -> str | None:
+        return getattr(self.scope.get("route"), "path", self.scope.get("path"))
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context.query_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if not context.execution_options.get("instrument", True):
+        return
+
+    elapsed = time.perf_counter() - context.query_start
+    stats = query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+    if slow_query_log.threshold and elapsed >= slow_query_log.threshold:
+        slow_query_log.record(conn, statement, parameters, executemany, elapsed, stats.route if stats else None)
+
+
+server_settings = {}
+if settings.pg_statement_timeout:
+    server_settings["statement_timeout"] = str(settings.pg_statement_timeout)
+
+
+def make_engine(dsn: str) -> AsyncEngine:
+    engine = create_async_engine(
+        dsn,
+        poolclass=TimedQueuePool,
+        pool_size=settings.pg_pool_size,
+        max_overflow=settings.pg_max_overflow,
+        pool_timeout=settings.pg_pool_timeout,
+        pool_pre_ping=settings.pg_pool_pre_ping,
+        pool_recycle=settings.pg_pool_recycle,
+        connect_args={
+            "statement_cache_size": settings.pg_statement_cache_size,
+            "server_settings": server_settings,
+        },
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    return engine
+
+
+engine = make_engine(database_dsn)
 async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=True)
 
 
+class ReplicaSet:
+    """
+    Выбор реплики по кругу. Недоступная реплика исключается на retry_interval секунд,
+    при отсутствии доступных реплик сессия открывается на основной базе.
+    """
+
+    def __init__(self, dsns: list[str], retry_interval: float) -> None:
+        self.engines = [make_engine(dsn) for dsn in dsns]
+        self.sessions = [sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=True) for engine in self.engines]
+        self.down_until = [0.0] * len(self.engines)
+        self.retry_interval = retry_interval
+        self.position = count()
+
+    async def open_session(self) -> AsyncSession:
+        for _ in range(len(self.sessions)):
+            index = next(self.position) % len(self.sessions)
+            if self.down_until[index] > time.monotonic():
+                continue
+
+            session = self.sessions[index]()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError, TimeoutError):
+                await session.close()
+                self.down_until[index] = time.monotonic() + self.retry_interval
+                continue
+
+            return session
+
+        return async_session()
+
+    def healthy(self) -> int:
+        now = time.monotonic()
+        return sum(down_until <= now for down_until in self.down_until)
+
+
+replicas = ReplicaSet(replica_dsns, settings.pg_replica_retry_interval)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         session: AsyncSession
@@ -21,3 +176,41 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.rollback()
         finally:
             await session.close()
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    session = await replicas.open_session()
+    try:
+        yield session
+    except Exception:
+        await session.rollback()
+    finally:
+        await session.close()
+
+
+def pool_metrics(pool: TimedQueuePool) -> dict[str, int | float]:
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.pg_max_overflow,
+        "waits": stats.waits,
+        "wait_timeouts": stats.timeouts,
+        "wait_avg_ms": stats.wait_total / stats.waits * 1000 if stats.waits else 0.0,
+        "wait_max_ms": stats.wait_max * 1000,
+    }
+
+
+def get_pool_metrics() -> dict:
+    """
+    Состояние пулов соединений текущего воркера: основной базы и каждой реплики отдельно.
+    """
+    return {
+        "pid": os.getpid(),
+        **pool_metrics(engine.pool),
+        "replicas": len(replicas.engines),
+        "replicas_healthy": replicas.healthy(),
+        "replica_pools": [pool_metrics(replica.pool) for replica in replicas.engines],
+    }
@@ -0,0 +1,170 @@
+import re
+from datetime import date, datetime, UTC
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+# Таблицы, секционированные помесячно по sale_date. Порядок важен: sale_item ссылается на sales,
+# поэтому ее секции отсоединяются и удаляются первыми.
+PARTITIONED_TABLES = ("sale_item", "sales")
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def parent_table(name: str) -> str:
+    """
+    Имя секционированной таблицы по имени ее секции (для остальных таблиц - само имя).
+    """
+    match = PARTITION_NAME.match(name)
+    if match:
+        return match["table"]
+
+    return name.removesuffix("_default")
+
+
+def month_bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=UTC).isoformat()
+
+
+async def list_partitions(connection: AsyncConnection, table: str) -> dict[date, str]:
+    """
+    Месячные секции таблицы: начало месяца -> имя секции. Секция по умолчанию не входит.
+    """
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for name in result.scalars():
+        match = PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions[date(int(match["year"]), int(match["month"]), 1)] = name
+
+    return partitions
+
+
+async def create_partitions(connection: AsyncConnection, first: date, last: date) -> list[str]:
+    """
+    Создание недостающих месячных секций с first по last включительно. Если строки месяца уже попали
+    в секцию по умолчанию (команда не запускалась вовремя), CREATE TABLE ... PARTITION OF нарушил бы ее
+    ограничение, поэтому строки месяца сначала переносятся во временные таблицы, а после создания секций
+    возвращаются в них.
+    """
+    existing = {table: await list_partitions(connection, table) for table in PARTITIONED_TABLES}
+    created = []
+    month = month_start(first)
+    while month <= last:
+        missing = [table for table in reversed(PARTITIONED_TABLES) if month not in existing[table]]
+        if missing:
+            moved = await has_default_rows(connection, missing, month)
+            if moved:
+                await stash_month(connection, month)
+
+            for table in missing:
+                name = partition_name(table, month)
+                await connection.execute(
+                    text(
+                        f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{month_bound(month)}') TO ('{month_bound(add_months(month, 1))}')"
+                    )
+                )
+                created.append(name)
+
+            if moved:
+                await restore_month(connection)
+
+        month = add_months(month, 1)
+
+    return created
+
+
+async def has_default_rows(connection: AsyncConnection, tables: list[str], month: date) -> bool:
+    for table in tables:
+        default = f"{table}_default"
+        if await connection.scalar(text("SELECT to_regclass(:name)"), {"name": default}) is None:
+            continue
+
+        query = text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE sale_date >= :start AND sale_date < :end)')
+        if await connection.scalar(query, month_range(month)):
+            return True
+
+    return False
+
+
+async def stash_month(connection: AsyncConnection, month: date) -> None:
+    """
+    Перенос строк месяца из всех секций во временные таблицы stash_<таблица>: sale_item раньше sales,
+    чтобы удаление продаж не задело позиции каскадом.
+    """
+    for table in PARTITIONED_TABLES:
+        condition = "sale_date >= :start AND sale_date < :end"
+        await connection.execute(
+            text(f'CREATE TEMP TABLE "stash_{table}" AS SELECT * FROM "{table}" WHERE {condition}'),
+            month_range(month),
+        )
+        await connection.execute(text(f'DELETE FROM "{table}" WHERE {condition}'), month_range(month))
+
+
+async def restore_month(connection: AsyncConnection) -> None:
+    for table in reversed(PARTITIONED_TABLES):
+        await connection.execute(text(f'INSERT INTO "{table}" SELECT * FROM "stash_{table}"'))
+        await connection.execute(text(f'DROP TABLE "stash_{table}"'))
+
+
+def month_range(month: date) -> dict[str, datetime]:
+    end = add_months(month, 1)
+    return {
+        "start": datetime(month.year, month.month, 1, tzinfo=UTC),
+        "end": datetime(end.year, end.month, 1, tzinfo=UTC),
+    }
+
+
+async def expire_partitions(connection: AsyncConnection, before: date, drop: bool = True) -> list[str]:
+    """
+    Отсоединение секций, целиком лежащих раньше before, и их удаление при drop=True.
+    Удаление секции - операция над метаданными и не зависит от числа строк, в отличие от DELETE.
+    У оставленных (архивных) таблиц снимаются внешние ключи: иначе ссылки из архива sale_item
+    не дали бы отсоединить секцию sales, а архив sales - удалять города и магазины.
+    """
+    expired = []
+    for table in PARTITIONED_TABLES:
+        for month, name in sorted((await list_partitions(connection, table)).items()):
+            if add_months(month, 1) > before:
+                continue
+
+            await connection.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            if drop:
+                await connection.execute(text(f'DROP TABLE "{name}"'))
+            else:
+                await drop_foreign_keys(connection, name)
+
+            expired.append(name)
+
+    return expired
+
+
+async def drop_foreign_keys(connection: AsyncConnection, name: str) -> None:
+    result = await connection.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"),
+        {"name": name},
+    )
+    for constraint in result.scalars().all():
+        await connection.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'))
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import re
+from collections import deque
+from datetime import datetime, UTC
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from configs.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"(?<![$\w.])\d+(?:\.\d+)?\b")
+WHITESPACE = re.compile(r"\s+")
+# Запросы, которые нельзя выполнять повторно ради EXPLAIN ANALYZE: блокировки строк, изменение данных
+# и функции с побочными эффектами (рекомендательные блокировки, последовательности, настройки, уведомления).
+SIDE_EFFECTS = re.compile(
+    r"\b(?:insert|update|delete|merge|share|pg_(?:try_)?advisory\w*|nextval|setval|set_config|pg_notify|pg_sleep\w*)\b",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Текст запроса без литералов и лишних пробелов, чтобы одинаковые запросы с разными значениями совпадали.
+    """
+    statement = STRING_LITERAL.sub("?", statement)
+    statement = NUMBER_LITERAL.sub("?", statement)
+
+    return WHITESPACE.sub(" ", statement).strip()
+
+
+def is_plain_read(statement: str) -> bool:
+    """
+    Простое чтение: один SELECT без FOR UPDATE/SHARE и без вызовов функций с побочными эффектами.
+    Литералы строк не учитываются, чтобы значения вроде 'update' не мешали.
+    """
+    statement = STRING_LITERAL.sub("?", statement).strip()
+
+    return statement[:6].upper() == "SELECT" and ";" not in statement.rstrip(";") and not SIDE_EFFECTS.search(statement)
+
+
+def parameter_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        item = type(value[0]).__name__ if value else "empty"
+        return f"{type(value).__name__}[{item}]({len(value)})"
+
+    return type(value).__name__
+
+
+def parameters_shape(parameters: Any, executemany: bool) -> dict[str, Any]:
+    """
+    Типы и размеры параметров без самих значений.
+    """
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "params": parameters_shape(rows[0], False)["params"] if rows else []}
+
+    if isinstance(parameters, dict):
+        return {"params": {name: parameter_shape(value) for name, value in parameters.items()}}
+
+    return {"params": [parameter_shape(value) for value in parameters or ()]}
+
+
+class SlowQueryLog:
+    """
+    Кольцевой буфер запросов дольше threshold_ms. План EXPLAIN (ANALYZE, BUFFERS) снимается отдельным
+    соединением в фоне и только для простых чтений (is_plain_read): ANALYZE выполняет запрос повторно. Одновременно строится
+    не больше одного плана, остальные медленные запросы в это время записываются без плана.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool) -> None:
+        self.threshold = threshold_ms / 1000
+        self.entries: deque[dict[str, Any]] = deque(maxlen=size)
+        self.explain = explain
+        self.explaining = False
+        self.tasks: set[asyncio.Task] = set()
+
+    def record(self, conn, statement: str, parameters, executemany: bool, elapsed: float, route: str | None) -> None:
+        entry = {
+            "logged_at": datetime.now(UTC).isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "route": route,
+            "statement": normalize_sql(statement),
+            **parameters_shape(parameters, executemany),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning(
+            "Slow query %.1f ms on %s: %s params=%s", entry["duration_ms"], route, entry["statement"], entry["params"]
+        )
+
+        if self.explain and not self.explaining and not executemany and is_plain_read(statement):
+            self.explaining = True
+            task = asyncio.get_running_loop().create_task(self.capture_plan(conn.engine, statement, parameters, entry))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def capture_plan(self, sync_engine, statement: str, parameters, entry: dict[str, Any]) -> None:
+        try:
+            async with AsyncEngine(sync_engine).connect() as connection:
+                connection = await connection.execution_options(instrument=False)
+                result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                entry["plan"] = "\n".join(row[0] for row in result)
+                await connection.rollback()
+        except Exception:
+            logger.warning("EXPLAIN of a slow query failed.", exc_info=True)
+        finally:
+            self.explaining = False
+
+    def recent(self, limit: int) -> list[dict[str, Any]]:
+        return list(self.entries)[::-1][:limit]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_threshold_ms, settings.slow_query_log_size, settings.slow_query_explain)
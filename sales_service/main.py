@@ -1,15 +1,51 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import configure_mappers
 
+from api.v1.admin import router as admin_router
 from api.v1.city import router as city_router
 from api.v1.product import router as product_router
 from api.v1.sales import router as sales_router
 from api.v1.store import router as store_router
 from configs.settings import settings
+from services.leaderboard_refresh import leaderboard_refresher
+from services.sales_queue import sales_queue_consumer
+from utils.conditional_get import ConditionalGetMiddleware
+from utils.error_handling import integrity_error_handler
+from utils.metrics import RequestMetricsMiddleware, metrics
+from utils.response_cache import ResponseCacheMiddleware
+from utils.serialization import default_response_class
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ошибка в связях моделей должна останавливать запуск, а не превращать каждый запрос в 500.
+    configure_mappers()
+    if settings.sales_queue:
+        sales_queue_consumer.start()
+    if settings.leaderboard_refresh_interval:
+        leaderboard_refresher.start()
+
+    yield
+
+    await sales_queue_consumer.stop()
+    await leaderboard_refresher.stop()
 
 
-app = FastAPI(title=settings.service_name)
+app = FastAPI(title=settings.service_name, default_response_class=default_response_class, lifespan=lifespan)
+app.add_exception_handler(IntegrityError, integrity_error_handler)
+if settings.response_cache_backend != "off":
+    app.add_middleware(ResponseCacheMiddleware)
+# Снаружи кэша: 304 по ETag и для закэшированных ответов, и при выключенном кэше.
+app.add_middleware(ConditionalGetMiddleware)
+if settings.request_metrics:
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_route("/metrics", metrics, include_in_schema=False)
 
+app.include_router(admin_router)
 app.include_router(city_router)
 app.include_router(product_router)
 app.include_router(sales_router)
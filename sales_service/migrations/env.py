@@ -11,6 +11,8 @@ from configs.settings import database_dsn
 from db.db_connect import Base
 from models.location import *
 from models.product import *
+from models.idempotency import *
+from models.leaderboard import *
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
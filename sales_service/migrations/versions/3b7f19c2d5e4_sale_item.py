@@ -0,0 +1,63 @@
+"""Sale items instead of product.sales_id
+
+Revision ID: 3b7f19c2d5e4
+Revises: 8c41d0b6e2a7
+Create Date: 2026-10-18 16:05:13.482906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7f19c2d5e4'
+down_revision: Union[str, None] = '8c41d0b6e2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sale_item',
+    sa.Column('sale_id', sa.Uuid(), nullable=False),
+    sa.Column('product_id', sa.Uuid(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=9, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['sale_id'], ['sales.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sale_id', 'product_id')
+    )
+    op.execute(
+        """
+        INSERT INTO sale_item (sale_id, product_id, quantity, unit_price)
+        SELECT sales_id, id, 1, price
+        FROM product
+        WHERE sales_id IS NOT NULL
+        """
+    )
+    op.create_index('ix_sale_item_product_id', 'sale_item', ['product_id', 'sale_id'], unique=False)
+    op.drop_index('ix_product_sales_id', table_name='product')
+    op.drop_constraint('product_sales_id_fkey', 'product', type_='foreignkey')
+    op.drop_column('product', 'sales_id')
+
+
+def downgrade() -> None:
+    op.add_column('product', sa.Column('sales_id', sa.Uuid(), nullable=True))
+    op.create_foreign_key('product_sales_id_fkey', 'product', 'sales', ['sales_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_product_sales_id', 'product', ['sales_id'], unique=False)
+    # Товар мог входить в несколько продаж, в product.sales_id остается последняя из них.
+    op.execute(
+        """
+        UPDATE product
+        SET sales_id = latest.sale_id
+        FROM (
+            SELECT DISTINCT ON (sale_item.product_id) sale_item.product_id, sale_item.sale_id
+            FROM sale_item
+            JOIN sales ON sales.id = sale_item.sale_id
+            ORDER BY sale_item.product_id, sales.sale_date DESC
+        ) AS latest
+        WHERE product.id = latest.product_id
+        """
+    )
+    op.drop_index('ix_sale_item_product_id', table_name='sale_item')
+    op.drop_table('sale_item')
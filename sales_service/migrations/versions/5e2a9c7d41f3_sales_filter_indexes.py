@@ -0,0 +1,42 @@
+"""Sales filter indexes
+
+Revision ID: 5e2a9c7d41f3
+Revises: bdcc240006da
+Create Date: 2026-10-18 10:12:04.318265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c7d41f3'
+down_revision: Union[str, None] = 'bdcc240006da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sales_city_id_sale_date', 'sales', ['city_id', 'sale_date'], unique=False)
+    op.create_index('ix_sales_store_id_sale_date', 'sales', ['store_id', 'sale_date'], unique=False)
+    op.create_index('ix_sales_sale_date_id', 'sales', ['sale_date', 'id'], unique=False)
+    op.create_index('ix_sales_sale_date_brin', 'sales', ['sale_date'], unique=False, postgresql_using='brin')
+    op.create_index('ix_sales_price', 'sales', ['price'], unique=False)
+    op.create_index('ix_sales_amount', 'sales', ['amount'], unique=False)
+    op.create_index('ix_product_sales_id', 'product', ['sales_id'], unique=False)
+    op.create_index('ix_product_store_id', 'product', ['store_id'], unique=False)
+    op.create_index('ix_store_city_id', 'store', ['city_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_store_city_id', table_name='store')
+    op.drop_index('ix_product_store_id', table_name='product')
+    op.drop_index('ix_product_sales_id', table_name='product')
+    op.drop_index('ix_sales_amount', table_name='sales')
+    op.drop_index('ix_sales_price', table_name='sales')
+    op.drop_index('ix_sales_sale_date_brin', table_name='sales', postgresql_using='brin')
+    op.drop_index('ix_sales_sale_date_id', table_name='sales')
+    op.drop_index('ix_sales_store_id_sale_date', table_name='sales')
+    op.drop_index('ix_sales_city_id_sale_date', table_name='sales')
@@ -0,0 +1,174 @@
+"""Partition sales and sale_item by month of sale_date
+
+Revision ID: 6d2e8a4f91b3
+Revises: 3b7f19c2d5e4
+Create Date: 2026-10-18 17:22:41.106385
+
+Таблицы пересоздаются секционированными и данные копируются, поэтому миграцию нужно выполнять
+в окно обслуживания. Первичный ключ секционированной таблицы обязан включать ключ секционирования,
+поэтому sales получает ключ (id, sale_date), а sale_item - колонку sale_date и внешний ключ
+(sale_id, sale_date). Создаются секции с месяца самой ранней продажи по текущий месяц плюс 3 месяца
+и секции по умолчанию; дальнейшие секции создает commands.manage_partitions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2e8a4f91b3'
+down_revision: Union[str, None] = '3b7f19c2d5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SALES_INDEXES = (
+    ('ix_sales_city_id_sale_date', ['city_id', 'sale_date'], None),
+    ('ix_sales_store_id_sale_date', ['store_id', 'sale_date'], None),
+    ('ix_sales_sale_date_id', ['sale_date', 'id'], None),
+    ('ix_sales_sale_date_brin', ['sale_date'], 'brin'),
+    ('ix_sales_price', ['price'], None),
+    ('ix_sales_amount', ['amount'], None),
+)
+
+
+def create_sales(primary_key: tuple[str, ...], **kwargs) -> None:
+    op.create_table('sales',
+    sa.Column('store_id', sa.Uuid(), nullable=False),
+    sa.Column('city_id', sa.Uuid(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=9, scale=2), nullable=False),
+    sa.Column('sale_date', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['city_id'], ['city.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['store_id'], ['store.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint(*primary_key),
+    **kwargs
+    )
+
+
+def create_sale_item(*columns, **kwargs) -> None:
+    op.create_table('sale_item',
+    sa.Column('sale_id', sa.Uuid(), nullable=False),
+    sa.Column('product_id', sa.Uuid(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Numeric(precision=9, scale=2), nullable=False),
+    *columns,
+    **kwargs
+    )
+
+
+def create_indexes() -> None:
+    for name, columns, using in SALES_INDEXES:
+        op.create_index(name, 'sales', columns, unique=False, postgresql_using=using)
+
+    op.create_index('ix_sale_item_product_id', 'sale_item', ['product_id', 'sale_id'], unique=False)
+
+
+def drop_indexes() -> None:
+    op.drop_index('ix_sale_item_product_id', table_name='sale_item')
+    for name, _, _ in SALES_INDEXES:
+        op.drop_index(name, table_name='sales')
+
+
+def rename_legacy() -> None:
+    drop_indexes()
+    op.execute('ALTER TABLE sale_item DROP CONSTRAINT sale_item_sale_id_fkey')
+    op.rename_table('sales', 'sales_legacy')
+    op.rename_table('sale_item', 'sale_item_legacy')
+    op.execute('ALTER TABLE sales_legacy RENAME CONSTRAINT sales_pkey TO sales_legacy_pkey')
+    op.execute('ALTER TABLE sale_item_legacy RENAME CONSTRAINT sale_item_pkey TO sale_item_legacy_pkey')
+
+
+def upgrade() -> None:
+    rename_legacy()
+
+    create_sales(primary_key=('id', 'sale_date'), postgresql_partition_by='RANGE (sale_date)')
+    create_sale_item(
+        sa.Column('sale_date', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('sale_id', 'product_id', 'sale_date'),
+        postgresql_partition_by='RANGE (sale_date)',
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date := date_trunc('month', coalesce((SELECT min(sale_date) FROM sales_legacy), now()) AT TIME ZONE 'UTC');
+            last_month date := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months';
+            lower_bound timestamptz;
+            upper_bound timestamptz;
+            parent text;
+        BEGIN
+            WHILE month <= last_month LOOP
+                lower_bound := month::timestamp AT TIME ZONE 'UTC';
+                upper_bound := (month + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+                FOREACH parent IN ARRAY ARRAY['sales', 'sale_item'] LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        parent || '_p' || to_char(month, 'YYYY_MM'), parent, lower_bound, upper_bound
+                    );
+                END LOOP;
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute('CREATE TABLE sales_default PARTITION OF sales DEFAULT')
+    op.execute('CREATE TABLE sale_item_default PARTITION OF sale_item DEFAULT')
+
+    op.execute(
+        """
+        INSERT INTO sales (store_id, city_id, amount, price, sale_date, id)
+        SELECT store_id, city_id, amount, price, sale_date, id
+        FROM sales_legacy
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO sale_item (sale_id, product_id, quantity, unit_price, sale_date)
+        SELECT sale_item_legacy.sale_id, sale_item_legacy.product_id, sale_item_legacy.quantity,
+               sale_item_legacy.unit_price, sales_legacy.sale_date
+        FROM sale_item_legacy
+        JOIN sales_legacy ON sales_legacy.id = sale_item_legacy.sale_id
+        """
+    )
+    create_indexes()
+    op.create_foreign_key(
+        'sale_item_sale_id_sale_date_fkey', 'sale_item', 'sales',
+        ['sale_id', 'sale_date'], ['id', 'sale_date'], ondelete='CASCADE',
+    )
+    op.drop_table('sale_item_legacy')
+    op.drop_table('sales_legacy')
+    op.execute('ANALYZE sales')
+    op.execute('ANALYZE sale_item')
+
+
+def downgrade() -> None:
+    op.drop_constraint('sale_item_sale_id_sale_date_fkey', 'sale_item', type_='foreignkey')
+    drop_indexes()
+    op.rename_table('sales', 'sales_partitioned')
+    op.rename_table('sale_item', 'sale_item_partitioned')
+    op.execute('ALTER TABLE sales_partitioned RENAME CONSTRAINT sales_pkey TO sales_partitioned_pkey')
+    op.execute('ALTER TABLE sale_item_partitioned RENAME CONSTRAINT sale_item_pkey TO sale_item_partitioned_pkey')
+
+    create_sales(primary_key=('id',))
+    create_sale_item(sa.PrimaryKeyConstraint('sale_id', 'product_id'))
+    op.execute(
+        """
+        INSERT INTO sales (store_id, city_id, amount, price, sale_date, id)
+        SELECT store_id, city_id, amount, price, sale_date, id
+        FROM sales_partitioned
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO sale_item (sale_id, product_id, quantity, unit_price)
+        SELECT sale_id, product_id, quantity, unit_price
+        FROM sale_item_partitioned
+        """
+    )
+    create_indexes()
+    op.create_foreign_key('sale_item_sale_id_fkey', 'sale_item', 'sales', ['sale_id'], ['id'], ondelete='CASCADE')
+    op.drop_table('sale_item_partitioned')
+    op.drop_table('sales_partitioned')
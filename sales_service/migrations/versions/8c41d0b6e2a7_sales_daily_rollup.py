@@ -0,0 +1,44 @@
+"""Sales daily rollup
+
+Revision ID: 8c41d0b6e2a7
+Revises: 5e2a9c7d41f3
+Create Date: 2026-10-18 11:40:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d0b6e2a7'
+down_revision: Union[str, None] = '5e2a9c7d41f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sales_daily_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('city_id', sa.Uuid(), nullable=False),
+    sa.Column('store_id', sa.Uuid(), nullable=False),
+    sa.Column('sales_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['city_id'], ['city.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['store_id'], ['store.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'city_id', 'store_id')
+    )
+    op.execute(
+        """
+        INSERT INTO sales_daily_rollup (day, city_id, store_id, sales_count, revenue, items)
+        SELECT CAST(timezone('UTC', sale_date) AS DATE), city_id, store_id, count(id), sum(price), sum(amount)
+        FROM sales
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sales_daily_rollup')
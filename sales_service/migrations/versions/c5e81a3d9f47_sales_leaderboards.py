@@ -0,0 +1,115 @@
+"""Sales leaderboards
+
+Revision ID: c5e81a3d9f47
+Revises: f27d4b8c06e1
+Create Date: 2026-10-18 21:48:19.270536
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81a3d9f47'
+down_revision: Union[str, None] = 'f27d4b8c06e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Окна (в сутках UTC, включая текущие) и глубина рейтинга, хранимая в представлениях.
+WINDOWS = "(VALUES (7), (30), (90)) AS windows (days)"
+DEPTH = 100
+
+
+def upgrade() -> None:
+    op.create_table('leaderboard_refresh',
+    sa.Column('name', sa.String(length=63), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_ms', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Продажи за 90 суток читаются один раз (с отсечением секций), затем раскладываются по окнам.
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW sales_product_leaderboard AS
+        WITH items AS (
+            SELECT
+                sales.city_id,
+                sale_item.product_id,
+                sale_item.quantity,
+                sale_item.quantity * sale_item.unit_price AS revenue,
+                CAST(timezone('UTC', now()) AS DATE) - CAST(timezone('UTC', sales.sale_date) AS DATE) AS age
+            FROM sales
+            JOIN sale_item ON sale_item.sale_id = sales.id AND sale_item.sale_date = sales.sale_date
+            WHERE sales.sale_date >= (CAST(timezone('UTC', now()) AS DATE) - 89) AT TIME ZONE 'UTC'
+              AND sale_item.sale_date >= (CAST(timezone('UTC', now()) AS DATE) - 89) AT TIME ZONE 'UTC'
+        ),
+        ranked AS (
+            SELECT
+                windows.days AS window_days,
+                items.city_id,
+                row_number() OVER (
+                    PARTITION BY windows.days, items.city_id
+                    ORDER BY sum(items.revenue) DESC, items.product_id
+                ) AS rank,
+                items.product_id,
+                sum(items.revenue) AS revenue,
+                sum(items.quantity) AS quantity,
+                count(*) AS sales_count
+            FROM items
+            JOIN {WINDOWS} ON items.age < windows.days
+            GROUP BY windows.days, items.city_id, items.product_id
+        )
+        SELECT * FROM ranked WHERE rank <= {DEPTH}
+        """
+    )
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW sales_store_leaderboard AS
+        WITH ranked AS (
+            SELECT
+                windows.days AS window_days,
+                sales_daily_rollup.city_id,
+                row_number() OVER (
+                    PARTITION BY windows.days, sales_daily_rollup.city_id
+                    ORDER BY sum(sales_daily_rollup.revenue) DESC, sales_daily_rollup.store_id
+                ) AS rank,
+                sales_daily_rollup.store_id,
+                sum(sales_daily_rollup.revenue) AS revenue,
+                sum(sales_daily_rollup.sales_count) AS sales_count,
+                sum(sales_daily_rollup.items) AS items
+            FROM sales_daily_rollup
+            JOIN {WINDOWS} ON sales_daily_rollup.day > CAST(timezone('UTC', now()) AS DATE) - windows.days
+            WHERE sales_daily_rollup.day > CAST(timezone('UTC', now()) AS DATE) - 90
+            GROUP BY windows.days, sales_daily_rollup.city_id, sales_daily_rollup.store_id
+        )
+        SELECT * FROM ranked WHERE rank <= {DEPTH}
+        """
+    )
+    # Уникальные индексы обязательны для REFRESH ... CONCURRENTLY и покрывают чтение рейтинга.
+    op.create_index(
+        'ix_sales_product_leaderboard_window_city_rank',
+        'sales_product_leaderboard',
+        ['window_days', 'city_id', 'rank'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_sales_store_leaderboard_window_city_rank',
+        'sales_store_leaderboard',
+        ['window_days', 'city_id', 'rank'],
+        unique=True,
+    )
+    op.execute(
+        """
+        INSERT INTO leaderboard_refresh (name, refreshed_at, duration_ms)
+        VALUES ('sales_product_leaderboard', now(), 0), ('sales_store_leaderboard', now(), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW sales_store_leaderboard")
+    op.execute("DROP MATERIALIZED VIEW sales_product_leaderboard")
+    op.drop_table('leaderboard_refresh')
@@ -0,0 +1,40 @@
+"""Sale ingestion queue
+
+Revision ID: f27d4b8c06e1
+Revises: a93c5e1f7b20
+Create Date: 2026-10-18 20:27:05.641903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f27d4b8c06e1'
+down_revision: Union[str, None] = 'a93c5e1f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sale_queue',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('store_id', sa.Uuid(), nullable=False),
+    sa.Column('city_id', sa.Uuid(), nullable=False),
+    sa.Column('products', sa.ARRAY(sa.Uuid()), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default='pending', nullable=False),
+    sa.Column('msg', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sale_queue_pending', 'sale_queue', ['created_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+    op.create_index('ix_sale_queue_processed_at', 'sale_queue', ['processed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sale_queue_processed_at', table_name='sale_queue')
+    op.drop_index('ix_sale_queue_pending', table_name='sale_queue', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('sale_queue')
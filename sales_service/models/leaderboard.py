@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, MetaData, Numeric, String, Table, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.db_connect import Base
+
+
+# Материализованные представления создаются миграцией; отдельная MetaData не дает autogenerate создавать их как таблицы.
+view_metadata = MetaData()
+
+product_leaderboard = Table(
+    "sales_product_leaderboard",
+    view_metadata,
+    Column("window_days", Integer),
+    Column("city_id", Uuid),
+    Column("rank", BigInteger),
+    Column("product_id", Uuid),
+    Column("revenue", Numeric(precision=14, scale=2)),
+    Column("quantity", BigInteger),
+    Column("sales_count", BigInteger),
+)
+
+store_leaderboard = Table(
+    "sales_store_leaderboard",
+    view_metadata,
+    Column("window_days", Integer),
+    Column("city_id", Uuid),
+    Column("rank", BigInteger),
+    Column("store_id", Uuid),
+    Column("revenue", Numeric(precision=14, scale=2)),
+    Column("sales_count", BigInteger),
+    Column("items", BigInteger),
+)
+
+
+class LeaderboardRefresh(Base):
+    """
+    Время последнего обновления материализованного представления (время снимка данных).
+    """
+
+    __tablename__ = "leaderboard_refresh"
+
+    name: Mapped[str] = mapped_column(String(63), primary_key=True)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0)
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.db_connect import Base
@@ -14,6 +14,8 @@ class City(Base, TableMixin):
 
 
 class Store(Base, TableMixin):
+    __table_args__ = (Index("ix_store_city_id", "city_id"),)
+
     name: Mapped[str] = mapped_column(String(100), nullable=False)
     city_id: Mapped[UUID] = mapped_column(ForeignKey("city.id", ondelete="CASCADE"), nullable=False)
 
@@ -1,7 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
-from sqlalchemy import DateTime, ForeignKey, func, Integer, Numeric, String, Text
+from sqlalchemy import (
+    ARRAY,
+    Date,
+    DateTime,
+    ForeignKey,
+    ForeignKeyConstraint,
+    func,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    text,
+    Text,
+    Uuid,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.db_connect import Base
@@ -10,6 +24,16 @@ from models.location import Store
 
 
 class Sales(Base, TableMixin):
+    __table_args__ = (
+        Index("ix_sales_city_id_sale_date", "city_id", "sale_date"),
+        Index("ix_sales_store_id_sale_date", "store_id", "sale_date"),
+        Index("ix_sales_sale_date_id", "sale_date", "id"),
+        Index("ix_sales_sale_date_brin", "sale_date", postgresql_using="brin"),
+        Index("ix_sales_price", "price"),
+        Index("ix_sales_amount", "amount"),
+        {"postgresql_partition_by": "RANGE (sale_date)"},
+    )
+
     store_id: Mapped[UUID] = mapped_column(ForeignKey("store.id", ondelete="CASCADE"), nullable=False)
     city_id: Mapped[UUID] = mapped_column(ForeignKey("city.id", ondelete="CASCADE"), nullable=False)
     amount: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -17,13 +41,81 @@ class Sales(Base, TableMixin):
     sale_date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
-        nullable=False,
+        primary_key=True,
+    )
+
+    items: Mapped[list["SaleItem"]] = relationship(passive_deletes=True)
+
+
+class SaleItem(Base):
+    """
+    Позиция продажи с ценой товара на момент продажи. У product_id нет внешнего ключа:
+    проверка ключа блокировала бы строку товара (FOR KEY SHARE) при каждой записи продажи.
+    sale_date повторяет дату продажи: таблица секционируется так же, как sales.
+    """
+
+    __tablename__ = "sale_item"
+    __table_args__ = (
+        ForeignKeyConstraint(["sale_id", "sale_date"], ["sales.id", "sales.sale_date"], ondelete="CASCADE"),
+        Index("ix_sale_item_product_id", "product_id", "sale_id"),
+        {"postgresql_partition_by": "RANGE (sale_date)"},
+    )
+
+    sale_id: Mapped[UUID] = mapped_column(primary_key=True)
+    product_id: Mapped[UUID] = mapped_column(primary_key=True)
+    sale_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    unit_price: Mapped[float] = mapped_column(Numeric(precision=9, scale=2), nullable=False)
+
+    product: Mapped["Product | None"] = relationship(
+        primaryjoin="foreign(SaleItem.product_id) == Product.id",
+        viewonly=True,
+        lazy="joined",
+    )
+
+
+class SalesDailyRollup(Base):
+    __tablename__ = "sales_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    city_id: Mapped[UUID] = mapped_column(ForeignKey("city.id", ondelete="CASCADE"), primary_key=True)
+    store_id: Mapped[UUID] = mapped_column(ForeignKey("store.id", ondelete="CASCADE"), primary_key=True)
+    sales_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    revenue: Mapped[float] = mapped_column(Numeric(precision=14, scale=2), nullable=False, default=0)
+    items: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class SaleQueue(Base):
+    """
+    Продажи, принятые с ответом 202 и ожидающие записи фоновым обработчиком. id становится ID продажи.
+    Ссылки не проверяются внешними ключами: ошибки фиксируются при обработке в status и msg.
+    """
+
+    __tablename__ = "sale_queue"
+    __table_args__ = (
+        Index("ix_sale_queue_pending", "created_at", postgresql_where=text("status = 'pending'")),
+        Index("ix_sale_queue_processed_at", "processed_at"),
     )
 
-    products: Mapped[list["Product"]] = relationship(back_populates="sales")
+    id: Mapped[UUID] = mapped_column(primary_key=True)
+    store_id: Mapped[UUID] = mapped_column(nullable=False)
+    city_id: Mapped[UUID] = mapped_column(nullable=False)
+    products: Mapped[list[UUID]] = mapped_column(ARRAY(Uuid), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default="pending")
+    msg: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
 
 class Product(Base, TableMixin):
+    __table_args__ = (
+        Index("ix_product_store_id", "store_id"),
+    )
+
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text)
     price: Mapped[float] = mapped_column(Numeric(precision=9, scale=2), nullable=False)
@@ -39,7 +131,11 @@ class Product(Base, TableMixin):
         nullable=False,
     )
     store_id: Mapped[UUID] = mapped_column(ForeignKey("store.id", ondelete="CASCADE"), nullable=False)
-    sales_id: Mapped[UUID | None] = mapped_column(ForeignKey("sales.id", ondelete="CASCADE"))
 
-    sales: Mapped["Sales"] = relationship(back_populates="products")
+    sales: Mapped[list["Sales"]] = relationship(
+        secondary="sale_item",
+        primaryjoin="Product.id == foreign(SaleItem.product_id)",
+        secondaryjoin="and_(Sales.id == foreign(SaleItem.sale_id), Sales.sale_date == foreign(SaleItem.sale_date))",
+        viewonly=True,
+    )
     store: Mapped["Store"] = relationship(back_populates="products")
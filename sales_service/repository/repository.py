@@ -1,16 +1,41 @@
 from abc import ABC, abstractmethod
 from typing import TypeVar
+from uuid import UUID
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import any_, ARRAY, bindparam, delete, func, select, update, Uuid
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload, with_parent
+from sqlalchemy.orm.attributes import set_committed_value
 
 from models.location import City, Store
 from models.product import Product, Sales
+from utils.pagination import estimate_total, with_window_total
+from utils.response_cache import response_cache
 
 
 Model = TypeVar("Model", City, Product, Sales, Store)
 
+# Колонки справочников, нужные для проверок существования и расчета цены.
+REFERENCE_COLUMNS = {
+    City: ("id",),
+    Store: ("id", "city_id"),
+    Product: ("id", "store_id", "price"),
+}
+
+
+async def get_rows_by_ids(model: Model, row_ids, session: AsyncSession) -> dict[UUID, dict]:
+    """
+    Строки справочника по множеству ID одним запросом WHERE id = ANY(:row_ids).
+    """
+    query = (
+        select(*(getattr(model, column) for column in REFERENCE_COLUMNS[model]))
+        .filter(model.id == any_(bindparam("row_ids", list(set(row_ids)), type_=ARRAY(Uuid))))
+        .execution_options(autoflush=False)
+    )
+    result = await session.execute(query)
+
+    return {row["id"]: dict(row) for row in result.mappings()}
+
 
 class BaseRepository(ABC):
     @abstractmethod
@@ -23,13 +48,36 @@ class BaseRepository(ABC):
     ) -> Model: ...
 
     @abstractmethod
-    async def get_list(self, model: Model, session: AsyncSession, limit: int, offset: int, **filters) -> list[Model | None]: ...
+    async def get_list(
+        self,
+        model: Model,
+        session: AsyncSession,
+        limit: int,
+        offset: int | None,
+        after: UUID | None = None,
+        columns: list | None = None,
+        with_total: bool = False,
+        **filters,
+    ) -> list[Model | None]: ...
+
+    @abstractmethod
+    async def count(self, model: Model, session: AsyncSession, estimate: bool = False, **filters) -> int: ...
+
+    @abstractmethod
+    async def get_related(
+        self,
+        instance: Model,
+        field: str,
+        session: AsyncSession,
+        limit: int,
+        after: UUID | None = None,
+    ) -> list[Model | None]: ...
 
     @abstractmethod
     async def create(self, data: dict, model: Model, session: AsyncSession) -> Model: ...
 
     @abstractmethod
-    async def update(self, data: dict, model: Model, session: AsyncSession, **filters) -> Model: ...
+    async def update(self, data: dict, model: Model, session: AsyncSession, **filters) -> dict | None: ...
 
     @abstractmethod
     async def delete(self, model: Model, session: AsyncSession, **filters) -> dict[str, str] | None: ...
@@ -45,48 +93,132 @@ class PostgresRepository(BaseRepository):
     ) -> Model | None:
         query = select(model).filter_by(**filters)
         if related_fields:
-            query = query.options(*(joinedload(getattr(model, field)) for field in related_fields))
+            query = query.options(*(self.__load_option(getattr(model, field)) for field in related_fields))
 
         data = await session.execute(query)
 
         return data.unique().scalar_one_or_none()
 
-    async def get_list(self, model: Model, session: AsyncSession, limit: int, offset: int, **filters) -> list[Model | None]:
-        query = select(model).filter_by(**filters).limit(limit).offset(offset)
+    async def get_list(
+        self,
+        model: Model,
+        session: AsyncSession,
+        limit: int,
+        offset: int | None,
+        after: UUID | None = None,
+        columns: list | None = None,
+        with_total: bool = False,
+        **filters,
+    ) -> list[Model | None]:
+        """
+        При offset=None используется keyset-пагинация по id, начиная после after.
+        При переданных columns возвращаются строки Core с этими колонками, без создания ORM-объектов.
+        При with_total к строкам добавляется колонка TOTAL_COLUMN, результат - всегда строки Core.
+        """
+        query = select(*columns) if columns else select(model)
+        query = query.filter_by(**filters).limit(limit)
+        if with_total:
+            query = with_window_total(query)
+
+        if offset is None:
+            query = query.order_by(model.id)
+            if after:
+                query = query.filter(model.id > after)
+        else:
+            query = query.offset(offset)
+
         result = await session.execute(query)
+        if columns or with_total:
+            return result.all()
 
         return result.scalars().all()
 
+    async def count(self, model: Model, session: AsyncSession, estimate: bool = False, **filters) -> int:
+        query = select(model).filter_by(**filters)
+        if estimate:
+            return await estimate_total(query, session)
+
+        return await session.scalar(select(func.count()).select_from(query.subquery()))
+
+    async def get_related(
+        self,
+        instance: Model,
+        field: str,
+        session: AsyncSession,
+        limit: int,
+        after: UUID | None = None,
+    ) -> list[Model | None]:
+        """
+        Загрузка одной страницы коллекции instance.field (keyset по id) вместо всей коллекции.
+        """
+        relationship = getattr(type(instance), field)
+        target = relationship.property.mapper.class_
+        query = select(target).where(with_parent(instance, relationship)).order_by(target.id).limit(limit)
+        if after:
+            query = query.filter(target.id > after)
+
+        result = await session.execute(query)
+        rows = result.scalars().all()
+        set_committed_value(instance, field, rows)
+
+        return rows
+
     async def create(self, data: dict, model: Model, session: AsyncSession) -> Model:
         instance = model(**data)
         session.add(instance)
         await session.commit()
+        await response_cache.bump(model.__tablename__)
         await session.refresh(instance)
 
         return instance
 
-    async def update(self, data: dict, model: Model, session: AsyncSession, **filters) -> Model:
-        update_query = update(model).values(**data).filter_by(**filters)
-        await session.execute(update_query)
-        await session.commit()
+    async def update(self, data: dict, model: Model, session: AsyncSession, **filters) -> dict | None:
+        """
+        Один UPDATE ... RETURNING: обновленная строка возвращается тем же запросом, отсутствие строки - None.
+        """
+        update_query = (
+            update(model)
+            .values(**data)
+            .filter_by(**filters)
+            .returning(*model.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(update_query)
+        instance = result.mappings().one_or_none()
+        if not instance:
+            return None
 
-        select_query = select(model).filter_by(**filters)
-        instance = await session.execute(select_query)
+        await session.commit()
+        await response_cache.bump(model.__tablename__)
 
-        return instance.scalar_one_or_none()
+        return dict(instance)
 
     async def delete(self, model: Model, session: AsyncSession, **filters) -> dict[str, str] | None:
-        select_query = select(model).filter_by(**filters)
-        instance = await session.execute(select_query)
-        if not instance.scalar_one_or_none():
+        delete_query = (
+            delete(model)
+            .filter_by(**filters)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(delete_query)
+        if not result.scalar_one_or_none():
             return None
 
-        delete_query = delete(model).filter_by(**filters)
-        await session.execute(delete_query)
         await session.commit()
+        await response_cache.bump(model.__tablename__)
 
         return {"msg": "Successfully deleted."}
 
+    @staticmethod
+    def __load_option(relationship):
+        """
+        Коллекции загружаются отдельным SELECT ... IN, чтобы JOIN не размножал строки родителя.
+        """
+        if relationship.property.uselist:
+            return selectinload(relationship)
+
+        return joinedload(relationship)
+
 
 repository: BaseRepository | None = PostgresRepository()
 
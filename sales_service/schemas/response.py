@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
+from pydantic import BaseModel
+
 from schemas.city import CityIdMixin, NameCityMixin
 from schemas.product import ProductIdMixin, ProductMixin
 from schemas.sales import SaleIdMixin, SaleMixin
@@ -19,7 +22,6 @@ class StoreResponse(BaseResponse, StoreIdMixin, StoreMixin): ...
 
 
 class ProductResponse(BaseResponse, ProductIdMixin, ProductMixin):
-    sales_id: UUID | None
     created_at: datetime
     updated_at: datetime
 
@@ -31,18 +33,83 @@ class SaleResponse(BaseResponse, SaleIdMixin, SaleMixin):
 
 
 class SingleCityResponse(CityResponse):
-    stores: list[None | StoreResponse]
+    stores: list[None | StoreResponse] | None
+    stores_next_cursor: str | None = None
 
 
 class SingleProductResponse(ProductResponse):
-    sales: SaleResponse | None
-    store: StoreResponse
+    sales: list[None | SaleResponse] | None
+    sales_next_cursor: str | None = None
+    store: StoreResponse | None = None
 
 
 class SingleStoreResponse(StoreResponse):
-    city: CityResponse
-    products: list[None | ProductResponse]
+    city: CityResponse | None = None
+    products: list[None | ProductResponse] | None
+    products_next_cursor: str | None = None
+
+
+class SaleItemResponse(BaseResponse, BaseModel):
+    product_id: UUID
+    quantity: int
+    unit_price: float
+    product: ProductResponse | None
 
 
 class SingleSaleResponse(SaleResponse):
-    products: list[None | ProductResponse]
+    items: list[SaleItemResponse]
+
+
+class SaleStatsResponse(BaseResponse, BaseModel):
+    group: UUID | datetime
+    count: int
+    price: float
+    amount: int
+
+
+class BulkSaleResponse(BaseModel):
+    index: int
+    success: bool
+    msg: str | None
+    sale: SaleResponse | None
+
+
+class QueuedSaleResponse(BaseResponse, SaleIdMixin):
+    status: Literal["pending", "done", "failed"]
+    msg: str | None
+    created_at: datetime
+    processed_at: datetime | None
+
+
+class LeaderboardMeta(BaseModel):
+    refreshed_at: datetime | None
+    age_seconds: float | None
+    refresh_interval: int
+
+
+class ProductLeaderboardEntry(BaseResponse, BaseModel):
+    rank: int
+    product_id: UUID
+    name: str | None
+    revenue: float
+    quantity: int
+    sales_count: int
+
+
+class StoreLeaderboardEntry(BaseResponse, BaseModel):
+    rank: int
+    store_id: UUID
+    name: str | None
+    revenue: float
+    sales_count: int
+    items: int
+
+
+class ProductLeaderboardResponse(BaseModel):
+    data: list[ProductLeaderboardEntry]
+    meta: LeaderboardMeta
+
+
+class StoreLeaderboardResponse(BaseModel):
+    data: list[StoreLeaderboardEntry]
+    meta: LeaderboardMeta
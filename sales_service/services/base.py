@@ -3,17 +3,21 @@ from uuid import UUID
 
 from fastapi import status
 from fastapi.responses import JSONResponse
-from sqlalchemy import select
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.product import Product, Sales
 from models.location import City, Store
-from repository.repository import BaseRepository
+from repository.repository import BaseRepository, get_rows_by_ids
+from configs.settings import settings
 from schemas.city import CreateCity, DeleteCity, UpdateCity
 from schemas.product import CreateProduct, DeleteProduct, UpdateProduct
+from schemas.response import CityResponse, ProductResponse, SaleResponse, StoreResponse
 from schemas.sales import CreateSale, DeleteSale, UpdateSale
 from schemas.store import CreateStore, DeleteStore, UpdateStore
 from utils.error_handling import error_response
+from utils.pagination import decode_cursor, encode_cursor, split_total, TotalMode
+from utils.serialization import render_list, response_columns
 
 
 Model = TypeVar("Model", City, Product, Sales, Store)
@@ -22,6 +26,13 @@ SchemaCreate = TypeVar("SchemaCreate", CreateCity, CreateProduct, CreateSale, Cr
 SchemaDelete = TypeVar("SchemaDelete", DeleteCity, DeleteProduct, DeleteSale, DeleteStore)
 SchemaUpdate = TypeVar("SchemaUpdate", UpdateCity, UpdateProduct, UpdateSale, UpdateStore)
 
+LIST_RESPONSES = {
+    City: CityResponse,
+    Product: ProductResponse,
+    Sales: SaleResponse,
+    Store: StoreResponse,
+}
+
 
 class BaseService:
     async def create_new_row(
@@ -49,6 +60,53 @@ class BaseService:
 
         return result
 
+    async def get_single_row_bounded(
+        self,
+        row_id: UUID,
+        related_fields: tuple[str],
+        collections: dict[str, tuple[int, str | None]],
+        include: str | None,
+        model: Model,
+        repository: BaseRepository,
+        session: AsyncSession,
+    ) -> dict | JSONResponse:
+        """
+        Метод для получения строки с ограниченными вложенными коллекциями.
+        collections: поле -> (limit, cursor); include - поля через запятую, остальные вложенные поля не загружаются.
+        """
+        fields = {field.strip() for field in include.split(",")} if include is not None else None
+        after = {}
+        for field, (_, cursor) in collections.items():
+            values = decode_cursor(cursor or "", 1)
+            if values is None:
+                return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+            try:
+                after[field] = UUID(values[0]) if values else None
+            except ValueError:
+                return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+        related_fields = tuple(field for field in related_fields if fields is None or field in fields)
+        instance = await repository.get_single(model, session, related_fields, id=row_id)
+        if not instance:
+            return error_response("Data with such ID not found.")
+
+        result = {attr.key: getattr(instance, attr.key) for attr in inspect(model).column_attrs}
+        for field in related_fields:
+            result[field] = getattr(instance, field)
+
+        for field, (limit, _) in collections.items():
+            result[field], result[f"{field}_next_cursor"] = None, None
+            if fields is not None and field not in fields:
+                continue
+
+            rows = await repository.get_related(instance, field, session, limit, after[field])
+            result[field] = rows
+            if len(rows) == limit:
+                result[f"{field}_next_cursor"] = encode_cursor(rows[-1].id)
+
+        return result
+
     async def get_list_rows(
         self,
         offset: int,
@@ -56,20 +114,109 @@ class BaseService:
         model: Model,
         repository: BaseRepository,
         session: AsyncSession,
-    ) -> dict[str, dict[str, int] | list[Model] | None]:
+        cursor: str | None = None,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict[str, int | str] | list[Model] | None] | JSONResponse:
+        if cursor is not None:
+            return await self.get_keyset_rows(cursor, limit, model, repository, session, with_total)
+
         offset_arg = (offset - 1) * limit
-        result = await repository.get_list(model, session, limit, offset_arg)
+        columns = self.list_columns(model)
+        exact = with_total == "exact"
+        result = await repository.get_list(model, session, limit, offset_arg, columns=columns, with_total=exact)
+        result, total = await self.list_total(result, with_total, offset_arg == 0, model, repository, session)
 
         prev_page = offset - 1 if offset > 1 else None
         next_page = offset + 1 if len(result) == limit else None
+        links = {
+            "prev": prev_page,
+            "next": next_page,
+        }
+        if with_total:
+            links["total"] = total
+
+        return render_list(
+            {
+                "links": links,
+                "data": result,
+            }
+        )
 
-        return {
-            "links": {
-                "prev": prev_page,
-                "next": next_page,
-            },
-            "data": result,
+    async def get_keyset_rows(
+        self,
+        cursor: str,
+        limit: int,
+        model: Model,
+        repository: BaseRepository,
+        session: AsyncSession,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict[str, str] | list[Model] | None] | JSONResponse:
+        """
+        Метод для keyset-пагинации по id: стоимость любой страницы равна стоимости первой.
+        Точное общее число (with_total=exact) считается только на первой странице.
+        """
+        values = decode_cursor(cursor, 1)
+        if values is None:
+            return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+        try:
+            after = UUID(values[0]) if values else None
+        except ValueError:
+            return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+        columns = self.list_columns(model)
+        first_page = after is None
+        with_total = with_total if first_page or with_total == "estimate" else None
+        exact = with_total == "exact"
+        result = await repository.get_list(model, session, limit, None, after, columns=columns, with_total=exact)
+        result, total = await self.list_total(result, with_total, first_page, model, repository, session)
+        next_cursor = encode_cursor(result[-1].id) if len(result) == limit else None
+        links = {
+            "next_cursor": next_cursor,
         }
+        if with_total:
+            links["total"] = total
+
+        return render_list(
+            {
+                "links": links,
+                "data": result,
+            }
+        )
+
+    async def list_total(
+        self,
+        rows: list,
+        with_total: TotalMode | None,
+        first_page: bool,
+        model: Model,
+        repository: BaseRepository,
+        session: AsyncSession,
+    ) -> tuple[list, int | None]:
+        """
+        Метод для получения общего числа строк: exact - из оконной колонки страницы
+        (для пустой страницы за концом списка - отдельный COUNT), estimate - оценка по статистике.
+        """
+        if with_total == "estimate":
+            return rows, await repository.count(model, session, estimate=True)
+
+        if with_total != "exact":
+            return rows, None
+
+        rows, total = split_total(rows, self.list_columns(model) is None)
+        if total is None:
+            total = 0 if first_page else await repository.count(model, session)
+
+        return rows, total
+
+    def list_columns(self, model: Model) -> list | None:
+        """
+        Колонки схемы ответа для быстрого пути списков, None - полноценные ORM-объекты.
+        """
+        if not settings.list_fast_path:
+            return None
+
+        return response_columns(model, LIST_RESPONSES[model])
 
     async def update_row_by_id(
         self,
@@ -77,7 +224,7 @@ class BaseService:
         model: Model,
         repository: BaseRepository,
         session: AsyncSession,
-    ) -> Model | JSONResponse:
+    ) -> dict | JSONResponse:
         data = product.model_dump()
         filters = {"id": data.get("id")}
         result = await repository.update(data, model, session, **filters)
@@ -104,10 +251,7 @@ class BaseService:
         """
         Метод для проверки существования строки с указанным ID.
         """
-        check_query = select(model).filter(model.id == row_id)
-
-        result = await session.execute(check_query)
-        result = result.scalar_one_or_none()
+        result = await get_rows_by_ids(model, (row_id,), session)
         if not result:
             return error_response("Wrong ID.", status.HTTP_400_BAD_REQUEST)
 
@@ -7,18 +7,35 @@ from models.location import City
 from repository.repository import BaseRepository
 from schemas.city import CreateCity, DeleteCity, UpdateCity
 from services.base import BaseService
+from utils.pagination import TotalMode
 
 
 class CityService(BaseService):
     async def new_city(self, data: CreateCity, repository: BaseRepository, session: AsyncSession) -> City:
         return await self.create_new_row(data, City, repository, session)
 
-    async def get_single_city(self, city_id: UUID, repository: BaseRepository, session: AsyncSession) -> City | JSONResponse:
-        related_fields = ("stores",)
-        return await self.get_single_row(city_id, related_fields, City, repository, session)
-
-    async def get_list_of_cities(self, offset: int, limit: int, repository: BaseRepository, session: AsyncSession) -> dict[str, dict | list[City]]:
-        return await self.get_list_rows(offset, limit, City, repository, session)
+    async def get_single_city(
+        self,
+        city_id: UUID,
+        repository: BaseRepository,
+        session: AsyncSession,
+        stores_limit: int = 100,
+        stores_cursor: str | None = None,
+        include: str | None = None,
+    ) -> dict | JSONResponse:
+        collections = {"stores": (stores_limit, stores_cursor)}
+        return await self.get_single_row_bounded(city_id, (), collections, include, City, repository, session)
+
+    async def get_list_of_cities(
+        self,
+        offset: int,
+        limit: int,
+        repository: BaseRepository,
+        session: AsyncSession,
+        cursor: str | None = None,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict | list[City]] | JSONResponse:
+        return await self.get_list_rows(offset, limit, City, repository, session, cursor, with_total)
 
     async def update_city_by_id(self, data: UpdateCity, repository: BaseRepository, session: AsyncSession) -> City | JSONResponse:
         return await self.update_row_by_id(data, City, repository, session)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from models.idempotency import IdempotencyKey
+from utils.error_handling import error_response
+from utils.serialization import default_response_class
+
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True, slots=True)
+class IdempotentRequest:
+    key: str
+    fingerprint: bytes
+
+
+class IdempotencyKeys:
+    """
+    Ответы на запросы с заголовком Idempotency-Key. Ключ записывается в транзакции самой операции,
+    поэтому ответ сохраняется тогда и только тогда, когда зафиксированы ее данные.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    def request(self, key: str | None, route: str, payload) -> IdempotentRequest | None:
+        if key is None:
+            return None
+
+        body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return IdempotentRequest(key, hashlib.sha256(f"{route}\n{body}".encode()).digest())
+
+    async def replay(self, request: IdempotentRequest, session: AsyncSession) -> JSONResponse | None:
+        """
+        Сохраненный ответ по ключу - одно чтение по первичному ключу. None, если ключа нет или он истек.
+        """
+        query = select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.response).where(
+            IdempotencyKey.key == request.key,
+            IdempotencyKey.expires_at > datetime.now(UTC),
+        )
+        row = (await session.execute(query)).one_or_none()
+        if row is None:
+            return None
+
+        if row.fingerprint != request.fingerprint:
+            return error_response(
+                "Idempotency-Key has already been used with a different request.",
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+        return default_response_class(row.response, status_code=row.status_code, headers={REPLAYED_HEADER: "true"})
+
+    async def save(
+        self,
+        request: IdempotentRequest,
+        status_code: int,
+        response: dict,
+        session: AsyncSession,
+    ) -> JSONResponse | None:
+        """
+        Запись ключа до commit операции. Если тот же ключ уже зафиксировал параллельный запрос,
+        транзакция откатывается и возвращается его ответ.
+        """
+        now = datetime.now(UTC)
+        insert_query = insert(IdempotencyKey).values(
+            key=request.key,
+            fingerprint=request.fingerprint,
+            status_code=status_code,
+            response=response,
+            expires_at=now + timedelta(seconds=self.ttl),
+        )
+        insert_query = insert_query.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": insert_query.excluded.fingerprint,
+                "status_code": insert_query.excluded.status_code,
+                "response": insert_query.excluded.response,
+                "expires_at": insert_query.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= now,
+        ).returning(IdempotencyKey.key)
+        if await session.scalar(insert_query) is not None:
+            return None
+
+        await session.rollback()
+        stored = await self.replay(request, session)
+
+        return stored or error_response("Request with this Idempotency-Key is in progress.", status.HTTP_409_CONFLICT)
+
+    async def purge(self, session: AsyncSession) -> int:
+        result = await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(UTC)))
+        await session.commit()
+
+        return result.rowcount
+
+
+idempotency_keys = IdempotencyKeys(settings.idempotency_key_ttl)
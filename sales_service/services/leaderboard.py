@@ -0,0 +1,163 @@
+import time
+from datetime import datetime, timedelta, UTC
+from uuid import UUID
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select, Table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from configs.settings import settings
+from models.leaderboard import LeaderboardRefresh, product_leaderboard, store_leaderboard
+from models.location import Store
+from models.product import Product
+from utils.conditional_get import version_etag
+from utils.error_handling import error_response
+
+
+LEADERBOARD_WINDOWS = (7, 30, 90)
+LEADERBOARD_VIEWS = (product_leaderboard, store_leaderboard)
+LEADERBOARDS = {"products": product_leaderboard, "stores": store_leaderboard}
+
+
+class LeaderboardLogic:
+    async def get_etag(self, board: str, city: UUID, days: int, limit: int, session: AsyncSession) -> str | None:
+        """
+        ETag рейтинга по времени снимка (refreshed_at) - одно чтение по первичному ключу вместо запроса
+        к представлению. Хэш тела не подходит: age_seconds меняется в каждом ответе. Названия товаров
+        и магазинов берутся при чтении, их изменение попадает в ETag со следующим обновлением представления.
+        None, если представление еще не обновлялось.
+        """
+        view = LEADERBOARDS[board]
+        refreshed_at = await session.scalar(
+            select(LeaderboardRefresh.refreshed_at).where(LeaderboardRefresh.name == view.name)
+        )
+
+        return version_etag(view.name, refreshed_at.isoformat(), city, days, limit) if refreshed_at else None
+
+    async def get_product_leaderboard(
+        self,
+        city: UUID,
+        days: int,
+        limit: int,
+        session: AsyncSession,
+    ) -> dict | JSONResponse:
+        """
+        Топ товаров города по выручке за последние days суток из sales_product_leaderboard.
+        """
+        query = (
+            select(
+                product_leaderboard.c.rank,
+                product_leaderboard.c.product_id,
+                Product.name,
+                product_leaderboard.c.revenue,
+                product_leaderboard.c.quantity,
+                product_leaderboard.c.sales_count,
+            )
+            .outerjoin(Product, Product.id == product_leaderboard.c.product_id)
+        )
+
+        return await self.__get_leaderboard(product_leaderboard, query, city, days, limit, session)
+
+    async def get_store_leaderboard(
+        self,
+        city: UUID,
+        days: int,
+        limit: int,
+        session: AsyncSession,
+    ) -> dict | JSONResponse:
+        """
+        Топ магазинов города по выручке за последние days суток из sales_store_leaderboard.
+        """
+        query = (
+            select(
+                store_leaderboard.c.rank,
+                store_leaderboard.c.store_id,
+                Store.name,
+                store_leaderboard.c.revenue,
+                store_leaderboard.c.sales_count,
+                store_leaderboard.c["items"],
+            )
+            .outerjoin(Store, Store.id == store_leaderboard.c.store_id)
+        )
+
+        return await self.__get_leaderboard(store_leaderboard, query, city, days, limit, session)
+
+    async def __get_leaderboard(
+        self,
+        view: Table,
+        query,
+        city: UUID,
+        days: int,
+        limit: int,
+        session: AsyncSession,
+    ) -> dict | JSONResponse:
+        if days not in LEADERBOARD_WINDOWS:
+            return error_response(
+                f"Days must be one of {', '.join(map(str, LEADERBOARD_WINDOWS))}.",
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        query = (
+            query.where(view.c.window_days == days, view.c.city_id == city)
+            .order_by(view.c.rank)
+            .limit(limit)
+        )
+        rows = (await session.execute(query)).all()
+        refreshed_at = await session.scalar(
+            select(LeaderboardRefresh.refreshed_at).where(LeaderboardRefresh.name == view.name)
+        )
+
+        return {"data": rows, "meta": self.__meta(refreshed_at)}
+
+    def __meta(self, refreshed_at: datetime | None) -> dict:
+        """
+        Данные рейтинга соответствуют моменту refreshed_at; age_seconds - их возраст на момент ответа.
+        """
+        age = (datetime.now(UTC) - refreshed_at).total_seconds() if refreshed_at else None
+
+        return {
+            "refreshed_at": refreshed_at,
+            "age_seconds": age,
+            "refresh_interval": settings.leaderboard_refresh_interval,
+        }
+
+    async def refresh_view(self, view: Table, interval: timedelta, session: AsyncSession) -> bool:
+        """
+        REFRESH MATERIALIZED VIEW CONCURRENTLY, если с прошлого обновления прошло не меньше interval.
+        Рекомендательная блокировка на время транзакции не дает нескольким воркерам обновлять представление
+        одновременно; чтение рейтинга во время обновления не блокируется.
+        """
+        locked = await session.scalar(select(func.pg_try_advisory_xact_lock(func.hashtext(view.name))))
+        if not locked:
+            await session.rollback()
+            return False
+
+        refreshed_at = await session.scalar(
+            select(LeaderboardRefresh.refreshed_at).where(LeaderboardRefresh.name == view.name)
+        )
+        if refreshed_at is not None and datetime.now(UTC) - refreshed_at < interval:
+            await session.rollback()
+            return False
+
+        start = time.perf_counter()
+        await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+        duration_ms = (time.perf_counter() - start) * 1000
+        insert_query = insert(LeaderboardRefresh).values(name=view.name, refreshed_at=func.now(), duration_ms=duration_ms)
+        await session.execute(
+            insert_query.on_conflict_do_update(
+                index_elements=[LeaderboardRefresh.name],
+                set_={"refreshed_at": insert_query.excluded.refreshed_at, "duration_ms": insert_query.excluded.duration_ms},
+            )
+        )
+        await session.commit()
+
+        return True
+
+
+leaderboard_logic = LeaderboardLogic()
+
+
+async def get_leaderboard_logic():
+    return leaderboard_logic
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from configs.settings import settings
+from db.db_connect import async_session
+from services.leaderboard import LEADERBOARD_VIEWS, leaderboard_logic
+
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardRefresher:
+    """
+    Фоновая задача воркера: раз в check_interval секунд обновляет рейтинги, с последнего обновления которых
+    прошло не меньше interval секунд. Обновление выполняет один воркер, остальные пропускают его.
+    """
+
+    check_interval = 30
+
+    def __init__(self, interval: int) -> None:
+        self.interval = timedelta(seconds=interval)
+        self.task: asyncio.Task | None = None
+        self.stopping = asyncio.Event()
+
+    def start(self) -> None:
+        self.stopping.clear()
+        self.task = asyncio.create_task(self.run(), name="leaderboard-refresher")
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+
+        self.stopping.set()
+        await self.task
+        self.task = None
+
+    async def run(self) -> None:
+        while not self.stopping.is_set():
+            for view in LEADERBOARD_VIEWS:
+                try:
+                    async with async_session() as session:
+                        if await leaderboard_logic.refresh_view(view, self.interval, session):
+                            logger.info("Leaderboard %s refreshed.", view.name)
+                except Exception:
+                    logger.exception("Leaderboard %s refresh failed.", view.name)
+
+            await self.wait()
+
+    async def wait(self) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), min(self.check_interval, self.interval.total_seconds()))
+        except TimeoutError:
+            pass
+
+
+leaderboard_refresher = LeaderboardRefresher(settings.leaderboard_refresh_interval)
@@ -8,6 +8,7 @@ from models.product import Product
 from repository.repository import BaseRepository
 from schemas.product import CreateProduct, DeleteProduct, UpdateProduct
 from services.base import BaseService
+from utils.pagination import TotalMode
 
 
 class ProductService(BaseService):
@@ -19,12 +20,29 @@ class ProductService(BaseService):
 
         return await self.create_new_row(product, Product, repository, session)
 
-    async def get_single_product(self, product_id: UUID, repository: BaseRepository, session: AsyncSession) -> Product | JSONResponse:
-        related_fields = ("sales", "store")
-        return await self.get_single_row(product_id, related_fields, Product, repository, session)
-
-    async def get_list_of_products(self, limit: int, offset: int, repository: BaseRepository, session: AsyncSession) -> dict[str, dict | list[Product]]:
-        return await self.get_list_rows(offset, limit, Product, repository, session)
+    async def get_single_product(
+        self,
+        product_id: UUID,
+        repository: BaseRepository,
+        session: AsyncSession,
+        sales_limit: int = 100,
+        sales_cursor: str | None = None,
+        include: str | None = None,
+    ) -> dict | JSONResponse:
+        related_fields = ("store",)
+        collections = {"sales": (sales_limit, sales_cursor)}
+        return await self.get_single_row_bounded(product_id, related_fields, collections, include, Product, repository, session)
+
+    async def get_list_of_products(
+        self,
+        limit: int,
+        offset: int,
+        repository: BaseRepository,
+        session: AsyncSession,
+        cursor: str | None = None,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict | list[Product]] | JSONResponse:
+        return await self.get_list_rows(offset, limit, Product, repository, session, cursor, with_total)
 
     async def update_product_by_id(self, product: UpdateProduct, repository: BaseRepository, session: AsyncSession) -> Product | JSONResponse:
         store_id = product.model_dump().get("store_id")
@@ -1,42 +1,334 @@
-from datetime import datetime, timedelta, UTC
+import csv
+import io
+import json
+from collections import Counter
+from datetime import date, datetime, time, timedelta, UTC
+from decimal import Decimal
+from typing import AsyncIterator, Literal
 from uuid import UUID, uuid4
 
 from fastapi import status
 from fastapi.responses import JSONResponse
-from sqlalchemy import delete, select, update
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    and_,
+    cast,
+    Date,
+    DateTime,
+    delete,
+    func,
+    literal,
+    literal_column,
+    Select,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Result
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from models.product import Product, Sales
-from repository.repository import BaseRepository
+from configs.settings import settings
+from db.db_connect import replicas
+from models.location import City, Store
+from models.product import Product, SaleItem, SaleQueue, Sales, SalesDailyRollup
+from repository.repository import BaseRepository, get_rows_by_ids
+from services.idempotency import idempotency_keys
+from schemas.response import BulkSaleResponse, QueuedSaleResponse, SaleResponse
 from schemas.sales import CreateSale, DeleteSale, UpdateSale
 from utils.error_handling import error_response
+from utils.response_cache import response_cache
+from utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    estimate_total,
+    split_total,
+    TotalMode,
+    with_window_total,
+)
+from utils.serialization import default_response_class, render_list, response_columns
+
+
+StatsGroup = Literal["city", "store", "product", "day", "week", "month"]
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_COLUMNS = ("id", "store_id", "city_id", "amount", "price", "sale_date")
+EXPORT_BATCH_SIZE = 1000
+
+bulk_response = TypeAdapter(dict[str, list[BulkSaleResponse]])
+
+
+def bulk_status_code(results: list[dict]) -> int:
+    """
+    201 - созданы все продажи пакета, 207 - часть, 422 - ни одной.
+    """
+    created = sum(result["success"] for result in results)
+    if created == len(results):
+        return status.HTTP_201_CREATED
+
+    return status.HTTP_207_MULTI_STATUS if created else status.HTTP_422_UNPROCESSABLE_ENTITY
+
+sale_day = cast(func.timezone("UTC", Sales.sale_date), Date)
+# Условие на ключ секционирования в соединении позволяет отсекать секции sale_item.
+sale_item_join = and_(SaleItem.sale_id == Sales.id, SaleItem.sale_date == Sales.sale_date)
 
 
 class SalesLogic:
-    async def new_sale(self, sale: CreateSale, session: AsyncSession) -> Sales | JSONResponse:
+    async def new_sale(
+        self,
+        sale: CreateSale,
+        session: AsyncSession,
+        idempotency_key: str | None = None,
+    ) -> dict | JSONResponse:
+        """
+        Продажа создается одним INSERT ... RETURNING, позиции - одним INSERT в sale_item;
+        строки товаров не изменяются и не блокируются. Повтор с тем же Idempotency-Key
+        возвращает сохраненный ответ без повторной записи.
+        """
+        request = idempotency_keys.request(idempotency_key, "sales.create", sale.model_dump(mode="json"))
+        if request is not None and (stored := await idempotency_keys.replay(request, session)) is not None:
+            return stored
+
         data = sale.model_dump()
-        data["amount"], data["price"], data["id"] = 0, 0, uuid4()
-        products = data.get("products")
-        del data["products"]
+        data["id"] = uuid4()
+        products = data.pop("products")
         if not products:
             return error_response("Products cannot be empty.", status.HTTP_400_BAD_REQUEST)
 
-        instance = Sales(**data)
-        session.add(instance)
+        prices = await self.__get_sale_prices(products, session)
+        if isinstance(prices, JSONResponse):
+            return prices
+
+        data["price"], data["amount"] = self.__price_sale(products, prices)
+        insert_query = insert(Sales).values(**data).returning(*Sales.__table__.columns, sale_day.label("day"))
+        row = (await session.execute(insert_query)).mappings().one()
+        await session.execute(insert(SaleItem), self.__sale_items(row["id"], row["sale_date"], products, prices))
+        await self.__apply_rollup_rows(
+            [(row["day"], row["city_id"], row["store_id"], 1, row["price"], row["amount"])],
+            session,
+        )
+        result = {column.name: row[column.name] for column in Sales.__table__.columns}
+        if request is not None:
+            response = SaleResponse.model_validate(result).model_dump(mode="json")
+            stored = await idempotency_keys.save(request, status.HTTP_201_CREATED, response, session)
+            if stored is not None:
+                return stored
+
+        await session.commit()
+        await response_cache.bump(Sales.__tablename__)
 
-        error = await self.__change_product_sale(instance, "POST", products, session)
-        if error:
-            return error
+        return result
 
+    async def new_sales_bulk(
+        self,
+        sales: list[CreateSale],
+        session: AsyncSession,
+        idempotency_key: str | None = None,
+    ) -> dict[str, list[dict]] | JSONResponse:
+        """
+        Метод для пакетного создания продаж в одной транзакции. Статус ответа - bulk_status_code;
+        если не создано ни одной продажи, ответ 422 с причинами и не сохраняется по Idempotency-Key.
+        """
+        request = idempotency_keys.request(
+            idempotency_key, "sales.bulk", [sale.model_dump(mode="json") for sale in sales]
+        )
+        if request is not None and (stored := await idempotency_keys.replay(request, session)) is not None:
+            return stored
+
+        results = await self.__insert_sales(sales, [uuid4() for _ in sales], session)
+        status_code = bulk_status_code(results)
+        if status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
+            return default_response_class(bulk_response.dump_python({"data": results}, mode="json"), status_code=status_code)
+
+        if request is not None:
+            response = bulk_response.dump_python({"data": results}, mode="json")
+            stored = await idempotency_keys.save(request, status_code, response, session)
+            if stored is not None:
+                return stored
+
+        await session.commit()
+        await response_cache.bump(Sales.__tablename__)
+
+        return {"data": results}
+
+    async def __insert_sales(
+        self,
+        sales: list[CreateSale],
+        sale_ids: list[UUID],
+        session: AsyncSession,
+        sale_dates: list[datetime] | None = None,
+    ) -> list[dict]:
+        """
+        Проверка и запись пакета продаж с заданными ID без commit. Товары, магазины и города проверяются
+        запросами по множеству ID, результат (успех или причина ошибки) возвращается по каждой продаже.
+        """
+        results = [{"index": index, "success": False, "msg": None, "sale": None} for index in range(len(sales))]
+        prices = await self.__get_product_prices({product_id for sale in sales for product_id in sale.products}, session)
+        stores = await get_rows_by_ids(Store, {sale.store_id for sale in sales}, session)
+        cities = await get_rows_by_ids(City, {sale.city_id for sale in sales}, session)
+
+        rows, indexes, baskets = [], [], []
+        for index, sale in enumerate(sales):
+            if not sale.products:
+                results[index]["msg"] = "Products cannot be empty."
+            elif sale.store_id not in stores:
+                results[index]["msg"] = "Wrong Store ID."
+            elif sale.city_id not in cities:
+                results[index]["msg"] = "Wrong City ID."
+            elif set(sale.products) - prices.keys():
+                results[index]["msg"] = "Wrong Product ID."
+            else:
+                price, amount = self.__price_sale(sale.products, prices)
+                row = {"id": sale_ids[index], "store_id": sale.store_id, "city_id": sale.city_id, "price": price, "amount": amount}
+                if sale_dates is not None:
+                    row["sale_date"] = sale_dates[index]
+
+                rows.append(row)
+                indexes.append(index)
+                baskets.append(sale.products)
+
+        if not rows:
+            return results
+
+        insert_query = insert(Sales).returning(
+            Sales.id,
+            Sales.store_id,
+            Sales.city_id,
+            Sales.amount,
+            Sales.price,
+            Sales.sale_date,
+            sale_day.label("day"),
+            sort_by_parameter_order=True,
+        )
+        created = (await session.execute(insert_query, rows)).mappings().all()
+        items = [
+            item
+            for sale, products in zip(created, baskets)
+            for item in self.__sale_items(sale["id"], sale["sale_date"], products, prices)
+        ]
+        await session.execute(insert(SaleItem), items)
+        await self.__apply_rollup_rows(
+            [(sale["day"], sale["city_id"], sale["store_id"], 1, sale["price"], sale["amount"]) for sale in created],
+            session,
+        )
+        for index, sale in zip(indexes, created):
+            results[index].update(success=True, sale={key: value for key, value in sale.items() if key != "day"})
+
+        return results
+
+    async def enqueue_sale(
+        self,
+        sale: CreateSale,
+        session: AsyncSession,
+        idempotency_key: str | None = None,
+    ) -> dict | JSONResponse:
+        """
+        Прием продажи в очередь sale_queue: проверяется только тело запроса, продажу с выданным ID
+        позже записывает фоновый обработчик (process_queued_sales).
+        """
+        # Своя область ключа: повтор того же Idempotency-Key в другом режиме (синхронно/через очередь)
+        # получает 422, а не ответ другого формата.
+        request = idempotency_keys.request(idempotency_key, "sales.enqueue", sale.model_dump(mode="json"))
+        if request is not None and (stored := await idempotency_keys.replay(request, session)) is not None:
+            return stored
+
+        if not sale.products:
+            return error_response("Products cannot be empty.", status.HTTP_400_BAD_REQUEST)
+
+        insert_query = insert(SaleQueue).values(
+            id=uuid4(),
+            store_id=sale.store_id,
+            city_id=sale.city_id,
+            products=sale.products,
+        ).returning(*SaleQueue.__table__.columns)
+        row = (await session.execute(insert_query)).mappings().one()
+        result = {name: row[name] for name in QueuedSaleResponse.model_fields}
+        if request is not None:
+            response = QueuedSaleResponse.model_validate(result).model_dump(mode="json")
+            stored = await idempotency_keys.save(request, status.HTTP_202_ACCEPTED, response, session)
+            if stored is not None:
+                return stored
+
+        await session.commit()
+
+        return result
+
+    async def process_queued_sales(self, limit: int, session: AsyncSession) -> int:
+        """
+        Обработка пакета из очереди. Строки блокируются с SKIP LOCKED, поэтому обработчики нескольких
+        воркеров не пересекаются; продажи и статусы очереди фиксируются одной транзакцией.
+        Датой продажи становится время приема. Если пакет не записывается (например, переполнение суммы
+        или нарушение внешнего ключа), продажи повторяются по одной в точках сохранения и ошибочные
+        помечаются failed: иначе одна строка навсегда блокировала бы начало очереди.
+        """
+        query = (
+            select(SaleQueue.id, SaleQueue.store_id, SaleQueue.city_id, SaleQueue.products, SaleQueue.created_at)
+            .where(SaleQueue.status == "pending")
+            .order_by(SaleQueue.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        queued = (await session.execute(query)).all()
+        if not queued:
+            return 0
+
+        sales = [CreateSale(store_id=row.store_id, city_id=row.city_id, products=row.products) for row in queued]
+        try:
+            async with session.begin_nested():
+                results = await self.__insert_sales(
+                    sales,
+                    [row.id for row in queued],
+                    session,
+                    [row.created_at for row in queued],
+                )
+        except DBAPIError:
+            results = []
+            for sale, row in zip(sales, queued):
+                try:
+                    async with session.begin_nested():
+                        results += await self.__insert_sales([sale], [row.id], session, [row.created_at])
+                except DBAPIError as error:
+                    results.append({"success": False, "msg": str(error.orig)})
+
+        processed_at = datetime.now(UTC)
+        await session.execute(
+            update(SaleQueue),
+            [
+                {
+                    "id": row.id,
+                    "status": "done" if result["success"] else "failed",
+                    "msg": result["msg"],
+                    "processed_at": processed_at,
+                }
+                for row, result in zip(queued, results)
+            ],
+        )
         await session.commit()
-        await session.refresh(instance)
+        if any(result["success"] for result in results):
+            await response_cache.bump(Sales.__tablename__)
 
-        return instance
+        return len(queued)
+
+    async def purge_sale_queue(self, older_than: timedelta, session: AsyncSession) -> int:
+        delete_query = delete(SaleQueue).where(SaleQueue.processed_at < datetime.now(UTC) - older_than)
+        result = await session.execute(delete_query)
+        await session.commit()
+
+        return result.rowcount
+
+    async def get_queued_sale(self, sale_id: UUID, session: AsyncSession) -> dict | JSONResponse:
+        query = select(*(getattr(SaleQueue, name) for name in QueuedSaleResponse.model_fields)).where(SaleQueue.id == sale_id)
+        row = (await session.execute(query)).mappings().one_or_none()
+        if row is None:
+            return error_response("Queued sale with such ID not found.")
+
+        return dict(row)
 
     async def get_single_sale(self, sale_id: UUID, repository: BaseRepository, session: AsyncSession) -> Sales | JSONResponse:
         filters = {"id": sale_id}
-        related_fields = ("products",)
+        related_fields = ("items",)
         result = await repository.get_single(Sales, session, related_fields, **filters)
         if not result:
             return error_response("Sale with such ID not found.")
@@ -54,8 +346,327 @@ class SalesLogic:
         price: float | None,
         amount: int | None,
         session: AsyncSession,
-    ) -> dict[str, dict[str, int] | list[Sales]]:
-        query = select(Sales)
+        cursor: str | None = None,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict[str, int | str] | list[Sales]] | JSONResponse:
+        if settings.list_fast_path:
+            query = select(*response_columns(Sales, SaleResponse))
+        else:
+            query = select(Sales)
+
+        query = self.filter_sales_query(query, city, store, product, days, price, amount)
+
+        if cursor is not None:
+            return await self.__get_keyset_page(query, cursor, limit, session, with_total)
+
+        offset_arg = (offset - 1) * limit
+        page_query = query.limit(limit).offset(offset_arg)
+        if with_total == "exact":
+            page_query = with_window_total(page_query)
+
+        result = await session.execute(page_query)
+        result, total = await self.__list_total(result, query, with_total, offset_arg == 0, session)
+
+        prev_page = offset - 1 if offset > 1 else None
+        next_page = offset + 1 if len(result) == limit else None
+        links = {
+            "prev": prev_page,
+            "next": next_page,
+        }
+        if with_total:
+            links["total"] = total
+
+        return render_list(
+            {
+                "links": links,
+                "data": result,
+            }
+        )
+
+    async def __get_keyset_page(
+        self,
+        query: Select,
+        cursor: str,
+        limit: int,
+        session: AsyncSession,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict[str, str] | list[Sales]] | JSONResponse:
+        """
+        Метод для keyset-пагинации по (sale_date, id) вместо LIMIT/OFFSET.
+        Точное общее число (with_total=exact) считается только на первой странице.
+        """
+        values = decode_cursor(cursor, 2)
+        if values is None:
+            return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+        page_query = query
+        if values:
+            try:
+                last_date, last_id = datetime.fromisoformat(values[0]), UUID(values[1])
+            except ValueError:
+                return error_response("Wrong cursor.", status.HTTP_400_BAD_REQUEST)
+
+            page_query = page_query.filter(tuple_(Sales.sale_date, Sales.id) > tuple_(last_date, last_id))
+            with_total = with_total if with_total == "estimate" else None
+
+        page_query = page_query.order_by(Sales.sale_date, Sales.id).limit(limit)
+        if with_total == "exact":
+            page_query = with_window_total(page_query)
+
+        result = await session.execute(page_query)
+        result, total = await self.__list_total(result, query, with_total, not values, session)
+
+        next_cursor = None
+        if len(result) == limit:
+            next_cursor = encode_cursor(result[-1].sale_date.isoformat(), result[-1].id)
+
+        links = {
+            "next_cursor": next_cursor,
+        }
+        if with_total:
+            links["total"] = total
+
+        return render_list(
+            {
+                "links": links,
+                "data": result,
+            }
+        )
+
+    async def __list_total(
+        self,
+        result: Result,
+        query: Select,
+        with_total: TotalMode | None,
+        first_page: bool,
+        session: AsyncSession,
+    ) -> tuple[list, int | None]:
+        """
+        Метод для разбора страницы и общего числа продаж: exact - из оконной колонки
+        (для пустой страницы за концом списка - отдельный COUNT), estimate - оценка планировщика.
+        """
+        if with_total != "exact":
+            rows = result.all() if settings.list_fast_path else result.scalars().all()
+            total = await estimate_total(query, session) if with_total == "estimate" else None
+            return rows, total
+
+        rows, total = split_total(result.all(), not settings.list_fast_path)
+        if total is None and not first_page:
+            total = await session.scalar(select(func.count()).select_from(query.subquery()))
+
+        return rows, total or 0
+
+    async def get_sales_stats(
+        self,
+        group_by: StatsGroup,
+        city: UUID | None,
+        store: UUID | None,
+        product: UUID | None,
+        days: int | None,
+        price: float | None,
+        amount: int | None,
+        session: AsyncSession,
+    ) -> dict[str, list]:
+        """
+        Метод для подсчета количества, суммы и числа товаров продаж в разрезе группы одним GROUP BY.
+        """
+        if group_by != "product" and not (product or price or amount):
+            return await self.__get_rollup_stats(group_by, city, store, days, session)
+
+        if group_by == "product":
+            group = SaleItem.product_id
+            query = (
+                select(
+                    group.label("group"),
+                    func.count(SaleItem.sale_id).label("count"),
+                    func.coalesce(func.sum(SaleItem.quantity * SaleItem.unit_price), 0).label("price"),
+                    func.coalesce(func.sum(SaleItem.quantity), 0).label("amount"),
+                )
+                .select_from(SaleItem)
+                .join(Sales, sale_item_join)
+            )
+            if product:
+                query = query.filter(SaleItem.product_id == product)
+                product = None
+
+            if days:
+                query = query.filter(SaleItem.sale_date >= datetime.now(UTC) - timedelta(days))
+        else:
+            group = self.__stats_group(group_by, Sales)
+            query = select(
+                group.label("group"),
+                func.count(Sales.id).label("count"),
+                func.coalesce(func.sum(Sales.price), 0).label("price"),
+                func.coalesce(func.sum(Sales.amount), 0).label("amount"),
+            )
+
+        query = self.filter_sales_query(query, city, store, product, days, price, amount)
+        query = query.group_by(group).order_by(group)
+        result = await session.execute(query)
+
+        return {"data": result.all()}
+
+    async def rebuild_daily_rollup(self, session: AsyncSession, since: date | None = None) -> int:
+        """
+        Метод для полного (или начиная с since) пересчета sales_daily_rollup из sales.
+        """
+        delete_query = delete(SalesDailyRollup)
+        aggregate_query = select(
+            sale_day,
+            Sales.city_id,
+            Sales.store_id,
+            func.count(Sales.id),
+            func.sum(Sales.price),
+            func.sum(Sales.amount),
+        ).group_by(sale_day, Sales.city_id, Sales.store_id)
+        if since:
+            delete_query = delete_query.filter(SalesDailyRollup.day >= since)
+            aggregate_query = aggregate_query.filter(Sales.sale_date >= datetime.combine(since, time(), UTC))
+
+        await session.execute(delete_query)
+        insert_query = insert(SalesDailyRollup).from_select(
+            ["day", "city_id", "store_id", "sales_count", "revenue", "items"],
+            aggregate_query,
+        )
+        result = await session.execute(insert_query)
+        await session.commit()
+        await response_cache.bump(Sales.__tablename__)
+
+        return result.rowcount
+
+    async def __get_rollup_stats(
+        self,
+        group_by: StatsGroup,
+        city: UUID | None,
+        store: UUID | None,
+        days: int | None,
+        session: AsyncSession,
+    ) -> dict[str, list]:
+        """
+        Метод для подсчета статистики по sales_daily_rollup.
+        Полные сутки читаются из rollup, неполные первые сутки периода days - из sales.
+        """
+        query = select(
+            self.__stats_group(group_by, SalesDailyRollup).label("group"),
+            SalesDailyRollup.sales_count.label("count"),
+            SalesDailyRollup.revenue.label("price"),
+            SalesDailyRollup.items.label("amount"),
+        )
+        if city:
+            query = query.filter(SalesDailyRollup.city_id == city)
+
+        if store:
+            query = query.filter(SalesDailyRollup.store_id == store)
+
+        if days:
+            since = datetime.now(UTC) - timedelta(days)
+            first_whole_day = since.date() + timedelta(1)
+            query = query.filter(SalesDailyRollup.day >= first_whole_day)
+
+            edge_query = select(
+                self.__stats_group(group_by, Sales).label("group"),
+                literal(1).label("count"),
+                Sales.price.label("price"),
+                Sales.amount.label("amount"),
+            ).filter(Sales.sale_date >= since, Sales.sale_date < datetime.combine(first_whole_day, time(), UTC))
+            edge_query = self.filter_sales_query(edge_query, city, store, None, None, None, None)
+            query = union_all(query, edge_query)
+
+        parts = query.subquery()
+        stats_query = (
+            select(
+                parts.c.group,
+                func.sum(parts.c.count).label("count"),
+                func.coalesce(func.sum(parts.c.price), 0).label("price"),
+                func.coalesce(func.sum(parts.c.amount), 0).label("amount"),
+            )
+            .group_by(parts.c.group)
+            .having(func.sum(parts.c.count) > 0)
+            .order_by(parts.c.group)
+        )
+        result = await session.execute(stats_query)
+
+        return {"data": result.all()}
+
+    def __stats_group(self, group_by: StatsGroup, model: type[Sales] | type[SalesDailyRollup]):
+        """
+        Метод для выбора выражения группировки: ID города/магазина или начало периода в UTC.
+        """
+        if group_by == "city":
+            return model.city_id
+
+        if group_by == "store":
+            return model.store_id
+
+        if model is SalesDailyRollup:
+            day = cast(SalesDailyRollup.day, DateTime)
+        else:
+            day = func.timezone("UTC", Sales.sale_date)
+
+        return func.date_trunc(literal_column(f"'{group_by}'"), day)
+
+    async def export_sales(
+        self,
+        export_format: ExportFormat,
+        city: UUID | None,
+        store: UUID | None,
+        product: UUID | None,
+        days: int | None,
+        price: float | None,
+        amount: int | None,
+    ) -> AsyncIterator[str]:
+        """
+        Метод для потоковой выгрузки продаж через серверный курсор без создания ORM- и Pydantic-объектов.
+        Сессия на реплике открывается здесь, так как зависимость db_dependency закрывается до начала отправки ответа.
+        """
+        query = select(*(getattr(Sales, column) for column in EXPORT_COLUMNS))
+        query = self.filter_sales_query(query, city, store, product, days, price, amount)
+        query = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+        if export_format == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+
+        session = await replicas.open_session()
+        async with session:
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                buffer = io.StringIO()
+                if export_format == "csv":
+                    csv.writer(buffer).writerows(
+                        (sale_id, store_id, city_id, amount, price, sale_date.isoformat())
+                        for sale_id, store_id, city_id, amount, price, sale_date in rows
+                    )
+                else:
+                    for sale_id, store_id, city_id, amount, price, sale_date in rows:
+                        buffer.write(
+                            json.dumps(
+                                {
+                                    "id": str(sale_id),
+                                    "store_id": str(store_id),
+                                    "city_id": str(city_id),
+                                    "amount": amount,
+                                    "price": float(price),
+                                    "sale_date": sale_date.isoformat(),
+                                }
+                            )
+                        )
+                        buffer.write("\n")
+
+                yield buffer.getvalue()
+
+    def filter_sales_query(
+        self,
+        query: Select,
+        city: UUID | None,
+        store: UUID | None,
+        product: UUID | None,
+        days: int | None,
+        price: float | None,
+        amount: int | None,
+    ) -> Select:
+        """
+        Метод для наложения фильтров продаж на запрос.
+        """
         if city:
             query = query.filter(Sales.city_id == city)
 
@@ -63,11 +674,13 @@ class SalesLogic:
             query = query.filter(Sales.store_id == store)
 
         if product:
-            query = query.join(Sales.products).filter(Product.id == product)
+            query = query.join(SaleItem, sale_item_join).filter(SaleItem.product_id == product)
 
         if days:
             current_time = datetime.now(UTC) - timedelta(days)
             query = query.filter(Sales.sale_date >= current_time)
+            if product:
+                query = query.filter(SaleItem.sale_date >= current_time)
 
         if price:
             if price < 0:
@@ -81,99 +694,164 @@ class SalesLogic:
             else:
                 query = query.filter(Sales.amount >= amount)
 
-        offset_arg = (offset - 1) * limit
-        query = query.limit(limit).offset(offset_arg)
-        result = await session.execute(query)
-        result = result.scalars().all()
+        return query
 
-        prev_page = offset - 1 if offset > 1 else None
-        next_page = offset + 1 if len(result) == limit else None
-
-        return {
-            "links": {
-                "prev": prev_page,
-                "next": next_page,
-            },
-            "data": result,
-        }
-
-    async def update_sale_by_id(self, sale: UpdateSale, session: AsyncSession) -> Sales | JSONResponse:
+    async def update_sale_by_id(self, sale: UpdateSale, session: AsyncSession) -> dict | JSONResponse:
+        """
+        Продажа обновляется одним UPDATE ... RETURNING: прежние город, магазин, сумма и количество читаются
+        в том же запросе (подзапрос с FOR UPDATE), поэтому дневные агрегаты корректируются без повторного SELECT.
+        Позиции продажи заменяются целиком.
+        """
         data = sale.model_dump()
-        filters = {"id": data.get("id")}
-        products = data.get("products")
-        del data["products"]
+        products = data.pop("products")
         if not products:
             return error_response("Products cannot be empty.", status.HTTP_400_BAD_REQUEST)
 
-        select_query = select(Sales).filter_by(**filters)
-        instance = await session.execute(select_query)
-        instance = instance.scalar_one_or_none()
-        if not instance:
+        prices = await self.__get_sale_prices(products, session)
+        if isinstance(prices, JSONResponse):
+            return prices
+
+        data["price"], data["amount"] = self.__price_sale(products, prices)
+        old = (
+            select(Sales.id, Sales.sale_date, Sales.city_id, Sales.store_id, Sales.price, Sales.amount)
+            .filter(Sales.id == data.pop("id"))
+            .with_for_update()
+            .subquery("old")
+        )
+        update_query = (
+            update(Sales)
+            .where(Sales.id == old.c.id, Sales.sale_date == old.c.sale_date)
+            .values(**data)
+            .returning(
+                *Sales.__table__.columns,
+                sale_day.label("day"),
+                old.c.city_id.label("old_city_id"),
+                old.c.store_id.label("old_store_id"),
+                old.c.price.label("old_price"),
+                old.c.amount.label("old_amount"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = (await session.execute(update_query)).mappings().one_or_none()
+        if not row:
             return error_response("Can't update a sale with this ID.")
 
-        error = await self.__change_product_sale(instance, "PUT", products, session)
-        if error:
-            return error
-
-        update_query = update(Sales).values(**data).filter_by(**filters)
-        await session.execute(update_query)
+        delete_items_query = (
+            delete(SaleItem)
+            .filter(SaleItem.sale_id == row["id"], SaleItem.sale_date == row["sale_date"])
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(delete_items_query)
+        await session.execute(insert(SaleItem), self.__sale_items(row["id"], row["sale_date"], products, prices))
+        await self.__apply_rollup_rows(
+            [
+                (row["day"], row["old_city_id"], row["old_store_id"], -1, row["old_price"], row["old_amount"]),
+                (row["day"], row["city_id"], row["store_id"], 1, row["price"], row["amount"]),
+            ],
+            session,
+        )
         await session.commit()
-        await session.refresh(instance)
+        await response_cache.bump(Sales.__tablename__)
 
-        return instance
+        return {column.name: row[column.name] for column in Sales.__table__.columns}
 
     async def delete_sale_by_id(self, sale: DeleteSale, session: AsyncSession) -> dict[str, str] | JSONResponse:
-        data = sale.model_dump()
-        filters = {"id": data.get("id")}
-        select_query = select(Sales).filter_by(**filters).options(joinedload(Sales.products))
-        instance = await session.execute(select_query)
-        instance = instance.unique().scalar_one_or_none()
-        if not instance:
+        """
+        Продажа удаляется одним DELETE ... RETURNING (позиции - каскадно), отсутствие строки означает 404.
+        """
+        delete_query = (
+            delete(Sales)
+            .filter(Sales.id == sale.id)
+            .returning(sale_day, Sales.city_id, Sales.store_id, literal(-1), Sales.price, Sales.amount)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await session.execute(delete_query)).one_or_none()
+        if not row:
             return error_response("Can't delete a sale with this ID.")
 
-        products = (product.id for product in instance.products)
-        error = await self.__change_product_sale(instance, "DELETE", products, session)
-        if error:
-            return error
-
-        delete_query = delete(Sales).filter_by(**filters)
-        await session.execute(delete_query)
+        await self.__apply_rollup_rows([tuple(row)], session)
         await session.commit()
+        await response_cache.bump(Sales.__tablename__)
 
         return {"msg": "Successfully deleted."}
 
-    async def __change_product_sale(
-        self,
-        instance: Sales,
-        method: str,
-        products: list[UUID],
-        session: AsyncSession,
-    ) -> None | JSONResponse:
+    async def __apply_rollup_rows(self, rows: list[tuple], session: AsyncSession) -> None:
         """
-        Метод для удаления или добавления Sales ID в Product.
+        Метод для изменения sales_daily_rollup по уже известным значениям продаж (из RETURNING),
+        без повторного чтения sales. Строка: (day, city_id, store_id, sign, price, amount).
         """
-        price, amount = 0.0, 0
-        for product_id in products:
-            filters = {"id": product_id}
-            query = select(Product).filter_by(**filters)
+        deltas = {}
+        for day, city_id, store_id, sign, price, amount in rows:
+            delta = deltas.setdefault((day, city_id, store_id), [0, Decimal(0), 0])
+            delta[0] += sign
+            delta[1] += sign * Decimal(price)
+            delta[2] += sign * amount
+
+        insert_query = insert(SalesDailyRollup).values(
+            [
+                {"day": day, "city_id": city_id, "store_id": store_id, "sales_count": count, "revenue": revenue, "items": items}
+                for (day, city_id, store_id), (count, revenue, items) in deltas.items()
+            ]
+        )
+        await session.execute(self.__upsert_rollup(insert_query))
+
+    @staticmethod
+    def __upsert_rollup(insert_query):
+        # excluded.items - метод коллекции колонок, а не колонка, поэтому доступ по ключу.
+        excluded = insert_query.excluded
+        return insert_query.on_conflict_do_update(
+            index_elements=["day", "city_id", "store_id"],
+            set_={
+                "sales_count": SalesDailyRollup.sales_count + excluded["sales_count"],
+                "revenue": SalesDailyRollup.revenue + excluded["revenue"],
+                "items": SalesDailyRollup.items + excluded["items"],
+            },
+        )
 
-            product = await session.execute(query)
-            product = product.scalar_one_or_none()
-            if not product:
-                await session.rollback()
-                return error_response("Wrong Product ID.", status.HTTP_400_BAD_REQUEST)
+    async def __get_product_prices(self, products, session: AsyncSession) -> dict[UUID, Decimal]:
+        """
+        Метод для получения текущих цен товаров одним запросом WHERE id = ANY(:row_ids).
+        """
+        rows = await get_rows_by_ids(Product, products, session)
 
-            if method in ("POST", "PUT"):
-                price += float(product.price)
-                amount += 1
-                product.sales_id = instance.id
-            else:
-                product.sales_id = None
+        return {product_id: row["price"] for product_id, row in rows.items()}
 
-        instance.price = price
-        instance.amount = amount
+    def __price_sale(self, products: list[UUID], prices: dict[UUID, Decimal]) -> tuple[float, int]:
+        """
+        Метод для расчета суммы и количества товаров продажи.
+        """
+        return sum(float(prices[product_id]) for product_id in products), len(products)
+
+    async def __get_sale_prices(self, products: list[UUID], session: AsyncSession) -> dict[UUID, Decimal] | JSONResponse:
+        """
+        Метод для проверки товаров продажи до любых изменений в базе.
+        """
+        prices = await self.__get_product_prices(products, session)
+        if set(products) - prices.keys():
+            return error_response("Wrong Product ID.", status.HTTP_400_BAD_REQUEST)
 
-        return None
+        return prices
+
+    def __sale_items(
+        self,
+        sale_id: UUID,
+        sale_date: datetime,
+        products: list[UUID],
+        prices: dict[UUID, Decimal],
+    ) -> list[dict]:
+        """
+        Метод для построения позиций продажи: повторы товара складываются в quantity, цена фиксируется на момент продажи.
+        """
+        return [
+            {
+                "sale_id": sale_id,
+                "sale_date": sale_date,
+                "product_id": product_id,
+                "quantity": quantity,
+                "unit_price": prices[product_id],
+            }
+            for product_id, quantity in Counter(products).items()
+        ]
 
 
 sale_logic = SalesLogic()
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from configs.settings import settings
+from db.db_connect import async_session
+from services.sales import sale_logic
+
+
+logger = logging.getLogger(__name__)
+
+
+class SalesQueueConsumer:
+    """
+    Фоновая задача воркера: разбирает sale_queue пакетами до batch_size продаж, при пустой очереди
+    ждет poll_interval секунд и раз в минуту удаляет обработанные строки старше retention секунд.
+    """
+
+    purge_interval = 60
+
+    def __init__(self, batch_size: int, poll_interval: float, retention: int) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retention = timedelta(seconds=retention)
+        self.task: asyncio.Task | None = None
+        self.stopping = asyncio.Event()
+        self.purged_at = 0.0
+
+    def start(self) -> None:
+        self.stopping.clear()
+        self.task = asyncio.create_task(self.run(), name="sales-queue-consumer")
+
+    async def stop(self) -> None:
+        """
+        Остановка после текущего пакета: его транзакция не прерывается.
+        """
+        if self.task is None:
+            return
+
+        self.stopping.set()
+        await self.task
+        self.task = None
+
+    async def run(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                async with async_session() as session:
+                    processed = await sale_logic.process_queued_sales(self.batch_size, session)
+                    if processed < self.batch_size:
+                        await self.purge(session)
+            except Exception:
+                logger.exception("Sales queue batch failed.")
+                processed = 0
+
+            if processed < self.batch_size:
+                await self.wait()
+
+    async def purge(self, session) -> None:
+        if time.monotonic() - self.purged_at < self.purge_interval:
+            return
+
+        self.purged_at = time.monotonic()
+        await sale_logic.purge_sale_queue(self.retention, session)
+
+    async def wait(self) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+        except TimeoutError:
+            pass
+
+
+sales_queue_consumer = SalesQueueConsumer(
+    settings.sales_queue_batch_size,
+    settings.sales_queue_poll_interval,
+    settings.sales_queue_retention,
+)
@@ -7,6 +7,7 @@ from models.location import City, Store
 from repository.repository import BaseRepository
 from schemas.store import CreateStore, DeleteStore, UpdateStore
 from services.base import BaseService
+from utils.pagination import TotalMode
 
 
 class StoreService(BaseService):
@@ -18,12 +19,29 @@ class StoreService(BaseService):
 
         return await self.create_new_row(store, Store, repository, session)
 
-    async def get_single_store(self, store_id: UUID, repository: BaseRepository, session: AsyncSession) -> Store | JSONResponse:
-        related_fields = ("city", "products")
-        return await self.get_single_row(store_id, related_fields, Store, repository, session)
-
-    async def get_list_of_stores(self, limit: int, offset: int, repository: BaseRepository, session: AsyncSession) -> dict[str, dict | list[Store]]:
-        return await self.get_list_rows(offset, limit, Store, repository, session)
+    async def get_single_store(
+        self,
+        store_id: UUID,
+        repository: BaseRepository,
+        session: AsyncSession,
+        products_limit: int = 100,
+        products_cursor: str | None = None,
+        include: str | None = None,
+    ) -> dict | JSONResponse:
+        related_fields = ("city",)
+        collections = {"products": (products_limit, products_cursor)}
+        return await self.get_single_row_bounded(store_id, related_fields, collections, include, Store, repository, session)
+
+    async def get_list_of_stores(
+        self,
+        limit: int,
+        offset: int,
+        repository: BaseRepository,
+        session: AsyncSession,
+        cursor: str | None = None,
+        with_total: TotalMode | None = None,
+    ) -> dict[str, dict | list[Store]] | JSONResponse:
+        return await self.get_list_rows(offset, limit, Store, repository, session, cursor, with_total)
 
     async def update_store_by_id(self, store: UpdateStore, repository: BaseRepository, session: AsyncSession) -> Store | JSONResponse:
         city_id = store.model_dump().get("city_id")
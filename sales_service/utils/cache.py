@@ -0,0 +1,57 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    LRU-кэш с ограничением размера и временем жизни записей. Рассчитан на один воркер (без блокировок).
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        item = self.data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.data.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key, value) -> None:
+        self.data[key] = (time.monotonic() + self.ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        self.data.pop(key, None)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
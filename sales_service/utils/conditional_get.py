@@ -0,0 +1,98 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from configs.settings import settings
+
+
+# Маршруты с условными GET-запросами; служебные /api/v1/admin и /metrics не затрагиваются.
+PREFIXES = ("/api/v1/city", "/api/v1/store", "/api/v1/product", "/api/v1/sales")
+CACHE_CONTROL = f"public, max-age={settings.http_cache_max_age}, must-revalidate"
+
+
+def make_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.sha1(body).hexdigest().encode() + b'"'
+
+
+def version_etag(*parts) -> str:
+    """
+    Слабый ETag по версии данных (например, времени их обновления) и параметрам запроса.
+    """
+    return 'W/"' + hashlib.sha1("\n".join(map(str, parts)).encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: bytes | None, etag: bytes) -> bool:
+    if not if_none_match:
+        return False
+
+    tags = {tag.strip().removeprefix(b"W/") for tag in if_none_match.split(b",")}
+    return b"*" in tags or etag.removeprefix(b"W/") in tags
+
+
+def not_modified(request: Request, response: Response, etag: str | None) -> Response | None:
+    """
+    ETag по версии данных до основного запроса к базе: выставляется в ответ, а при совпадении
+    с If-None-Match возвращается готовый 304.
+    """
+    if etag is None:
+        return None
+
+    response.headers["ETag"] = etag
+    if not etag_matches(request.headers.get("if-none-match", "").encode("latin-1"), etag.encode()):
+        return None
+
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+class ConditionalGetMiddleware:
+    """
+    Условные GET-запросы независимо от кэша ответов. ETag, выставленный обработчиком по версии данных,
+    используется как есть, иначе для ответа одним сообщением ETag - хэш тела. При совпадении
+    с If-None-Match тело заменяется на 304. Потоковые ответы (выгрузка) без ETag обработчика передаются
+    без изменений: хэш потребовал бы буферизации всей выгрузки.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(PREFIXES):
+            return await self.app(scope, receive, send)
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        start, skip = None, False
+
+        async def send_wrapper(message) -> None:
+            nonlocal start, skip
+            if message["type"] == "http.response.start" and message["status"] == status.HTTP_200_OK:
+                start = message
+                return
+
+            if skip:
+                return
+
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = list(start.get("headers", ()))
+            etag = next((value for name, value in headers if name.lower() == b"etag"), None)
+            if etag is None and not message.get("more_body"):
+                etag = make_etag(message.get("body", b""))
+                headers.append((b"etag", etag))
+            if etag is not None:
+                headers = [(name, value) for name, value in headers if name.lower() != b"cache-control"]
+                headers.append((b"cache-control", CACHE_CONTROL.encode()))
+
+            response_start, start = {**start, "headers": headers}, None
+            if etag is not None and etag_matches(if_none_match, etag):
+                skip = message.get("more_body", False)
+                headers = [(name, value) for name, value in headers if name.lower() not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": status.HTTP_304_NOT_MODIFIED, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(response_start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -3,9 +3,10 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.db_connect import get_session
+from db.db_connect import get_read_session, get_session
 from repository.repository import BaseRepository, get_repository
 
 
 db_dependency = Annotated[AsyncSession, Depends(get_session)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_session)]
 repository_dependency = Annotated[BaseRepository, Depends(get_repository)]
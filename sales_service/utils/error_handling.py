@@ -1,6 +1,22 @@
-from fastapi import status
+from fastapi import Request, status
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+
+from utils.serialization import default_response_class
 
 
 def error_response(msg: str, status_code: int = status.HTTP_404_NOT_FOUND) -> JSONResponse:
-    return JSONResponse({"msg": msg}, status_code=status_code)
+    return default_response_class({"msg": msg}, status_code=status_code)
+
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+async def integrity_error_handler(request: Request, exc: IntegrityError) -> JSONResponse:
+    """
+    Ссылка на строку, удаленную после проверки (гонка с удалением), - ошибка запроса, а не сервера.
+    """
+    if getattr(exc.orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+        raise exc
+
+    return error_response("Referenced row does not exist.", status.HTTP_400_BAD_REQUEST)
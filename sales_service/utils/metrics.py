@@ -0,0 +1,101 @@
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+from db.db_connect import QueryStats, query_stats
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration",
+    ["method", "route", "status"],
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL execution time per HTTP request",
+    ["method", "route"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Number of SQL statements per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, float("inf")),
+)
+
+
+def route_template(scope) -> str:
+    """
+    Шаблон маршрута (/api/v1/sales/{sale_id}) вместо фактического пути, чтобы число меток было ограничено.
+    Ответы из кэша не доходят до роутера, для них маршрут подбирается повторно.
+    """
+    route = scope.get("route")
+    if route is None and "app" in scope:
+        for candidate in scope["app"].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+
+    return getattr(route, "path", "unmatched")
+
+
+def server_timing(stats: QueryStats, elapsed: float) -> bytes:
+    return (
+        f'db;desc="{stats.count} queries";dur={stats.duration * 1000:.2f}, '
+        f"app;dur={(elapsed - stats.duration) * 1000:.2f}, "
+        f"total;dur={elapsed * 1000:.2f}"
+    ).encode()
+
+
+class RequestMetricsMiddleware:
+    """
+    Время обработки запроса, число SQL-запросов и время в базе. Значения на момент отправки заголовков
+    возвращаются в Server-Timing, итоговые - в гистограммы /metrics по шаблону маршрута.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats(scope)
+        token = query_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [*message.get("headers", ()), (b"server-timing", server_timing(stats, time.perf_counter() - start))]
+                message = {**message, "headers": headers}
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            method, route = scope["method"], route_template(scope)
+            REQUEST_DURATION.labels(method, route, str(status)).observe(elapsed)
+            REQUEST_DB_DURATION.labels(method, route).observe(stats.duration)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.count)
+
+
+async def metrics(request: Request) -> Response:
+    """
+    Метрики в формате Prometheus. При запуске нескольких воркеров gunicorn задайте PROMETHEUS_MULTIPROC_DIR,
+    тогда значения собираются со всех воркеров.
+    """
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
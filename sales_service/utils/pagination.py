@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+from typing import Literal
+
+from sqlalchemy import func, Select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+TotalMode = Literal["exact", "estimate"]
+
+TOTAL_COLUMN = "total_count"
+
+
+def encode_cursor(*values) -> str:
+    """
+    Упаковка значений ключа последней строки в непрозрачный курсор.
+    """
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str] | None:
+    """
+    Распаковка курсора. Пустой курсор означает первую страницу, None - некорректный курсор.
+    """
+    if not cursor:
+        return []
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(value, str) for value in values):
+        return None
+
+    return values
+
+
+def with_window_total(query: Select) -> Select:
+    """
+    Общее число строк считается оконной функцией в том же запросе, до LIMIT/OFFSET.
+    """
+    return query.add_columns(func.count().over().label(TOTAL_COLUMN))
+
+
+def split_total(rows: list, entities: bool) -> tuple[list, int | None]:
+    """
+    Отделение колонки TOTAL_COLUMN от строк. Для строк Core колонка остается и отбрасывается при сериализации.
+    """
+    total = getattr(rows[0], TOTAL_COLUMN) if rows else None
+    if entities:
+        rows = [row[0] for row in rows]
+
+    return rows, total
+
+
+async def estimate_total(query: Select, session: AsyncSession) -> int:
+    """
+    Оценка числа строк без выполнения запроса: для запроса без фильтров - сумма pg_class.reltuples
+    по листьям дерева секций (у секционированной родительской таблицы reltuples всегда 0, обычная
+    таблица - сама себе лист), иначе или если какая-то секция еще не анализировалась (reltuples = -1) -
+    оценка планировщика (Plan Rows из EXPLAIN).
+    """
+    query = query.limit(None).offset(None).order_by(None)
+    froms = query.get_final_froms()
+    if query.whereclause is None and len(froms) == 1 and hasattr(froms[0], "name"):
+        reltuples = await session.scalar(
+            text(
+                "SELECT CASE WHEN bool_and(pg_class.reltuples >= 0) THEN sum(pg_class.reltuples) END "
+                "FROM pg_partition_tree(CAST(:name AS regclass)) AS tree "
+                "JOIN pg_class ON pg_class.oid = tree.relid WHERE tree.isleaf"
+            ),
+            {"name": froms[0].name},
+        )
+        if reltuples is not None:
+            return int(reltuples)
+
+    connection = await session.connection()
+    compiled = query.compile(dialect=connection.dialect)
+    params = compiled.construct_params()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}",
+        tuple(params[name] for name in compiled.positiontup or ()),
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from urllib.parse import parse_qsl, urlencode
+
+from configs.settings import settings
+from utils.cache import TTLCache
+from utils.conditional_get import make_etag
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def get_versions(self, keys: list[str]) -> list[int]: ...
+
+    @abstractmethod
+    async def incr_versions(self, keys: list[str]) -> None: ...
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Кэш в памяти воркера. TTL записей общий и задается при создании.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.data = TTLCache(maxsize, ttl)
+        self.versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.data.set(key, value)
+
+    async def get_versions(self, keys: list[str]) -> list[int]:
+        return [self.versions.get(key, 0) for key in keys]
+
+    async def incr_versions(self, keys: list[str]) -> None:
+        for key in keys:
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+
+class RedisBackend(CacheBackend):
+    """
+    Общий для всех воркеров кэш в Redis (или совместимом сервере). Клиент можно передать явно, например fakeredis.
+    """
+
+    def __init__(self, url: str, client=None) -> None:
+        if client is None:
+            from redis.asyncio import Redis
+
+            client = Redis.from_url(url)
+
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def get_versions(self, keys: list[str]) -> list[int]:
+        return [int(version or 0) for version in await self.client.mget(keys)]
+
+    async def incr_versions(self, keys: list[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+
+
+class ResponseCache:
+    """
+    Кэш ответов GET-запросов. Ключ состоит из пути, нормализованных параметров запроса и версий сущностей,
+    от которых зависит ответ. Запись сущности увеличивает ее версию, и старые ключи перестают использоваться.
+    """
+
+    # Префикс маршрута -> сущности, данные которых входят в ответ.
+    routes = {
+        "/api/v1/city": ("city", "store"),
+        "/api/v1/store": ("store", "city", "product"),
+        "/api/v1/product": ("product", "store", "sales"),
+        "/api/v1/sales": ("sales", "product"),
+    }
+    # Рейтинги обновляются фоновой задачей без версии сущности и несут возраст данных, вычисляемый на каждый ответ.
+    excluded = ("/api/v1/sales/export", "/api/v1/sales/queue", "/api/v1/sales/leaderboard")
+    # Сущности, которые меняются вместе с записанной (каскадное удаление).
+    cascades = {
+        "city": ("store", "product", "sales"),
+        "store": ("product", "sales"),
+        "product": (),
+        "sales": (),
+    }
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    def entities_for(self, path: str) -> tuple[str, ...]:
+        if path.startswith(self.excluded):
+            return ()
+
+        for prefix, entities in self.routes.items():
+            if path == prefix or path.startswith(prefix + "/"):
+                return entities
+
+        return ()
+
+    async def make_key(self, path: str, query_string: bytes, entities: tuple[str, ...]) -> str:
+        versions = await self.backend.get_versions([f"version:{entity}" for entity in entities])
+        query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        namespace = ".".join(f"{entity}{version}" for entity, version in zip(entities, versions))
+        digest = hashlib.sha1(f"{path}?{query}".encode()).hexdigest()
+
+        return f"response:{namespace}:{digest}"
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.backend.get(key)
+        except Exception:
+            logger.warning("Response cache read failed.", exc_info=True)
+            return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception:
+            logger.warning("Response cache write failed.", exc_info=True)
+
+    async def bump(self, entity: str) -> None:
+        """
+        Метод для инвалидации всех закэшированных ответов, зависящих от сущности.
+        """
+        entities = (entity, *self.cascades.get(entity, ()))
+        try:
+            await self.backend.incr_versions([f"version:{name}" for name in entities])
+        except Exception:
+            logger.warning("Response cache invalidation failed.", exc_info=True)
+
+
+class ResponseCacheMiddleware:
+    """
+    Кэширование ответов GET-запросов вместе с их ETag (хэш тела). При попадании в кэш ни запрос к базе,
+    ни сериализация не выполняются; 304 по If-None-Match отдает ConditionalGetMiddleware снаружи.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+
+        entities = response_cache.entities_for(scope["path"])
+        if not entities:
+            return await self.app(scope, receive, send)
+
+        try:
+            key = await response_cache.make_key(scope["path"], scope["query_string"], entities)
+        except Exception:
+            logger.warning("Response cache key lookup failed.", exc_info=True)
+            return await self.app(scope, receive, send)
+
+        cached = await response_cache.get(key)
+        if cached is not None:
+            etag, body = cached.split(b"\n", 1)
+            await self.send_response(send, body, etag, b"hit")
+            return
+
+        start, chunks = {}, []
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                start.update(message)
+                if message["status"] != 200:
+                    await send(message)
+                return
+
+            if start.get("status") != 200:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+
+            body = b"".join(chunks)
+            etag = make_etag(body)
+            await response_cache.set(key, etag + b"\n" + body)
+            await self.send_response(send, body, etag, b"miss", start.get("headers", ()))
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def send_response(self, send, body: bytes, etag: bytes, cache_status: bytes, headers=()) -> None:
+        headers = [(name, value) for name, value in headers if name.lower() not in (b"content-length", b"content-type")]
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"etag", etag),
+            (b"x-cache", cache_status),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_backend() -> CacheBackend:
+    """
+    При RESPONSE_CACHE_BACKEND=off middleware не подключается, а версии сущностей остаются в памяти без пользы.
+    Версии memory-бэкенда свои у каждого воркера: запись на одном воркере не инвалидирует кэш остальных.
+    """
+    if settings.response_cache_backend == "redis":
+        return RedisBackend(settings.response_cache_url)
+
+    return MemoryBackend(settings.response_cache_size, settings.response_cache_ttl)
+
+
+response_cache = ResponseCache(make_backend(), settings.response_cache_ttl)
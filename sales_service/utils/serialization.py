@@ -0,0 +1,62 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import cast, Float, Numeric
+
+from configs.settings import settings
+from utils.pagination import TOTAL_COLUMN
+
+
+list_adapter = TypeAdapter(dict[str, Any])
+
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ на orjson: UUID и datetime кодируются нативно, Decimal - как число.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+default_response_class = FastJSONResponse if settings.json_response == "orjson" else JSONResponse
+
+
+def response_columns(model, schema: type[BaseModel]) -> list:
+    """
+    Колонки модели, нужные схеме ответа. Numeric приводится к float на стороне базы, как в схемах.
+    """
+    columns = []
+    for name in schema.model_fields:
+        column = getattr(model, name)
+        if isinstance(column.type, Numeric):
+            column = cast(column, Float).label(name)
+
+        columns.append(column)
+
+    return columns
+
+
+def render_list(payload: dict) -> dict | Response:
+    """
+    Быстрый путь списков: строки Core сериализуются напрямую, без ORM-объектов и повторной валидации response_model.
+    """
+    if not settings.list_fast_path:
+        return payload
+
+    payload["data"] = [row._asdict() for row in payload["data"]]
+    if payload["data"] and TOTAL_COLUMN in payload["data"][0]:
+        for row in payload["data"]:
+            del row[TOTAL_COLUMN]
+
+    return Response(list_adapter.dump_json(payload), media_type="application/json")